@@ -40,12 +40,18 @@ AUTO_INGEST_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"} & AUTO_INGEST_ALLOWED_E
 AUTO_INGEST_SANITY_MULTIPLIER = float(os.getenv("AUTO_INGEST_SANITY_MULTIPLIER", "3"))
 AUTO_INGEST_CHANNEL_DEFAULT_MIN_COUNT = int(os.getenv("AUTO_INGEST_CHANNEL_DEFAULT_MIN_COUNT", "2"))
 AUTO_INGEST_CHANNEL_DEFAULT_MIN_SCORE = float(os.getenv("AUTO_INGEST_CHANNEL_DEFAULT_MIN_SCORE", "0.9"))
+AUTO_INGEST_CONCURRENCY = max(int(os.getenv("AUTO_INGEST_CONCURRENCY", "2")), 1)
 
 QUALITY_MODES = {
     "original": "Original (100%)",
     "lossless": "Lossless",
     "webtoon": "Webtoon Optimized",
     "smart": "Smart Compress",
+    "webp": "WebP",
+    "avif": "AVIF",
+    "target": "Target SSIM",
+    "target_webp": "Target SSIM (WebP)",
+    "auto": "Auto",
 }
 
 INGEST_CACHE_LIMIT = int(os.getenv("INGEST_CACHE_LIMIT", "5000"))
@@ -422,7 +422,11 @@ async def upload_confirm(callback: CallbackQuery, state: FSMContext) -> None:
         await state.update_data(manhwa_id=manhwa_id)
         await state.set_state(UploadChapter.chapter_number)
         await callback.message.answer(
-            f"Upload complete. Pages: {result['pages_count']}",
+            f"Upload complete. Pages: {result['pages_count']} "
+            f"(kept {result['passthrough_count']}, reused {result['reused_count']}, "
+            f"re-encoded {result['transcoded_count']}, tiles {result['tile_count']}, "
+            f"saved {result['saved_bytes'] // 1024} KiB, trimmed {result['trimmed_pixels']} px, "
+            f"downscaled {result['downscaled_count']})",
         )
         await _prompt_chapter(callback.message, manhwa_id)
     except Exception as exc:  # noqa: BLE001
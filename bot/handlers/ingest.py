@@ -37,6 +37,7 @@ from ..config import (
     AUTO_INGEST_SANITY_MULTIPLIER,
     AUTO_INGEST_CHANNEL_DEFAULT_MIN_COUNT,
     AUTO_INGEST_CHANNEL_DEFAULT_MIN_SCORE,
+    AUTO_INGEST_CONCURRENCY,
 )
 from ..i18n import button_label, ensure_access, get_user_lang, menu_labels, menu_labels_all, t
 from ..keyboards import inline_cancel_back_kb, inline_chapter_kb, inline_manhwa_kb, main_menu_kb
@@ -3086,10 +3087,55 @@ async def _run_auto_ingest(message: Message, state: FSMContext) -> None:
         return
 
     progress_message = await message.answer(f"Starting auto ingest: {len(pending)} chapters")
-    semaphore = asyncio.Semaphore(2)
+    semaphore = asyncio.Semaphore(AUTO_INGEST_CONCURRENCY)
     progress_lock = asyncio.Lock()
     completed = {"count": 0, "success": 0}
     deploy_batch = 5
+    staged: list[tuple[dict, dict]] = []
+
+    def _mark_success(candidate: dict, pages_count: int) -> None:
+        candidate["status"] = "ingested"
+        candidate["pages_count"] = pages_count
+        _mark_ingested_source(candidate)
+        completed["success"] += 1
+        _log_ingest_event(
+            "chapter_ingested",
+            {"manhwa_id": manhwa_id, "chapter": candidate["chapter"], "pages": pages_count},
+        )
+
+    def _mark_failed(candidate: dict, reason: str) -> None:
+        candidate["status"] = "failed"
+        candidate["reason"] = reason
+        _log_ingest_event(
+            "chapter_failed",
+            {"manhwa_id": manhwa_id, "chapter": candidate.get("chapter"), "error": reason},
+        )
+
+    async def _commit_staged() -> None:
+        batch = staged[:]
+        staged.clear()
+        if not batch:
+            return
+        try:
+            added = await asyncio.to_thread(
+                processor.add_chapters,
+                MANHWA_PATH,
+                manhwa_id,
+                [(candidate["chapter"], result["pages"], result.get("meta")) for candidate, result in batch],
+                auto_deploy_enabled=False,
+                skip_existing=True,
+            )
+        except Exception as exc:  # noqa: BLE001
+            for candidate, _ in batch:
+                _mark_failed(candidate, str(exc))
+        else:
+            added_numbers = {chapter["number"] for chapter in added}
+            for candidate, result in batch:
+                if str(candidate["chapter"]) in added_numbers:
+                    _mark_success(candidate, result["pages_count"])
+                else:
+                    _mark_failed(candidate, "Chapter already exists.")
+        _update_ingest_queue(manhwa_id, queue)
 
     async def _process(candidate: dict) -> None:
         async with semaphore:
@@ -3126,27 +3172,17 @@ async def _run_auto_ingest(message: Message, state: FSMContext) -> None:
                     False,
                     "page-",
                     3,
+                    True,
                 )
                 _write_chapter_manifest(manhwa_id, candidate["chapter"], result["pages"], candidate)
-                candidate["status"] = "ingested"
-                candidate["pages_count"] = result["pages_count"]
-                _mark_ingested_source(candidate)
-                completed["success"] += 1
-                _log_ingest_event(
-                    "chapter_ingested",
-                    {"manhwa_id": manhwa_id, "chapter": candidate["chapter"], "pages": result["pages_count"]},
-                )
+                staged.append((candidate, result))
                 if local_path.exists():
                     local_path.unlink()
-                if completed["success"] % deploy_batch == 0:
+                if len(staged) >= deploy_batch:
+                    await _commit_staged()
                     await asyncio.to_thread(processor.trigger_deploy)
             except Exception as exc:  # noqa: BLE001
-                candidate["status"] = "failed"
-                candidate["reason"] = str(exc)
-                _log_ingest_event(
-                    "chapter_failed",
-                    {"manhwa_id": manhwa_id, "chapter": candidate.get("chapter"), "error": str(exc)},
-                )
+                _mark_failed(candidate, str(exc))
             finally:
                 completed["count"] += 1
                 _update_ingest_queue(manhwa_id, queue)
@@ -3156,6 +3192,7 @@ async def _run_auto_ingest(message: Message, state: FSMContext) -> None:
                     )
 
     await asyncio.gather(*[_process(item) for item in pending])
+    await _commit_staged()
     await asyncio.to_thread(processor.trigger_deploy)
     await progress_message.edit_text(
         f"Auto ingest complete. Success {completed['success']}/{len(pending)}"
@@ -52,7 +52,7 @@ async def file_rules(message: Message) -> None:
         "- PDF\n"
         "- ZIP (images)\n"
         "- JPG/PNG (single)\n"
-        "Files are auto-detected and converted to JPG pages."
+        "Files are auto-detected and converted to JPG pages (or WebP/AVIF in those quality modes)."
     )
     await message.answer(rules, reply_markup=main_menu_kb(get_user_lang(message.from_user.id)))
 
@@ -67,7 +67,11 @@ async def platform_settings(message: Message, state: FSMContext) -> None:
     text = (
         f"Auto deploy: {settings['auto_deploy']}\n"
         f"DMCA watermark text: {settings['dmca_watermark_text'] or 'disabled'}\n"
-        f"DMCA watermark opacity: {settings['dmca_watermark_opacity']}\n\n"
+        f"DMCA watermark opacity: {settings['dmca_watermark_opacity']}\n"
+        f"JPEG fallback pages: {settings.get('jpeg_fallback', False)}\n"
+        f"Strip JPEG metadata: {settings.get('strip_metadata', False)}\n"
+        f"Trim page borders: {settings.get('trim_borders', False)}\n"
+        f"Downscale oversized pages: {settings.get('downscale_oversized', False)}\n\n"
         "Choose an action:"
     )
     await message.answer(text, reply_markup=_settings_kb(get_user_lang(message.from_user.id)))
@@ -87,6 +91,62 @@ async def toggle_auto_deploy(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
+@router.callback_query(F.data == "settings:jpeg_fallback")
+async def toggle_jpeg_fallback(callback: CallbackQuery) -> None:
+    if not await ensure_access(callback, can_manage_manhwa):
+        return
+    settings = processor.load_settings(SETTINGS_PATH)
+    settings["jpeg_fallback"] = not settings.get("jpeg_fallback", False)
+    processor.save_settings(SETTINGS_PATH, settings)
+    await callback.message.answer(
+        f"JPEG fallback pages set to {settings['jpeg_fallback']}",
+        reply_markup=_settings_kb(get_user_lang(callback.from_user.id)),
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data == "settings:strip_metadata")
+async def toggle_strip_metadata(callback: CallbackQuery) -> None:
+    if not await ensure_access(callback, can_manage_manhwa):
+        return
+    settings = processor.load_settings(SETTINGS_PATH)
+    settings["strip_metadata"] = not settings.get("strip_metadata", False)
+    processor.save_settings(SETTINGS_PATH, settings)
+    await callback.message.answer(
+        f"Strip JPEG metadata set to {settings['strip_metadata']}",
+        reply_markup=_settings_kb(get_user_lang(callback.from_user.id)),
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data == "settings:trim_borders")
+async def toggle_trim_borders(callback: CallbackQuery) -> None:
+    if not await ensure_access(callback, can_manage_manhwa):
+        return
+    settings = processor.load_settings(SETTINGS_PATH)
+    settings["trim_borders"] = not settings.get("trim_borders", False)
+    processor.save_settings(SETTINGS_PATH, settings)
+    await callback.message.answer(
+        f"Trim page borders set to {settings['trim_borders']}",
+        reply_markup=_settings_kb(get_user_lang(callback.from_user.id)),
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data == "settings:downscale_oversized")
+async def toggle_downscale_oversized(callback: CallbackQuery) -> None:
+    if not await ensure_access(callback, can_manage_manhwa):
+        return
+    settings = processor.load_settings(SETTINGS_PATH)
+    settings["downscale_oversized"] = not settings.get("downscale_oversized", False)
+    processor.save_settings(SETTINGS_PATH, settings)
+    await callback.message.answer(
+        f"Downscale oversized pages set to {settings['downscale_oversized']}",
+        reply_markup=_settings_kb(get_user_lang(callback.from_user.id)),
+    )
+    await callback.answer()
+
+
 @router.callback_query(F.data == "settings:dmca_text")
 async def dmca_text_start(callback: CallbackQuery, state: FSMContext) -> None:
     if not await ensure_access(callback, can_manage_manhwa):
@@ -187,6 +247,10 @@ async def back_to_menu(message: Message, state: FSMContext) -> None:
 def _settings_kb(lang: str) -> InlineKeyboardMarkup:
     rows = [
         [InlineKeyboardButton(text="Toggle Auto Deploy", callback_data="settings:auto")],
+        [InlineKeyboardButton(text="Toggle JPEG Fallback", callback_data="settings:jpeg_fallback")],
+        [InlineKeyboardButton(text="Toggle Strip Metadata", callback_data="settings:strip_metadata")],
+        [InlineKeyboardButton(text="Toggle Trim Borders", callback_data="settings:trim_borders")],
+        [InlineKeyboardButton(text="Toggle Downscale Oversized", callback_data="settings:downscale_oversized")],
         [InlineKeyboardButton(text="Update DMCA Text", callback_data="settings:dmca_text")],
         [InlineKeyboardButton(text="Update DMCA Opacity", callback_data="settings:dmca_opacity")],
         [InlineKeyboardButton(text=button_label("restart", lang), callback_data="flow:restart")],
@@ -10,9 +10,24 @@
 let manhwasData = [];
 let currentSliderIndex = 0;
 const MANHWA_URL = "/manhwa.json";
+const VERSION_URL = "/version.json";
 function getManhwaUrl() {
     return `${MANHWA_URL}?t=${Date.now()}`;
 }
+async function resolveManhwaUrl() {
+    try {
+        const response = await fetch(VERSION_URL, { cache: 'no-store' });
+        if (response.ok) {
+            const version = await response.json();
+            if (version && version.manhwa) {
+                return { url: version.manhwa, cache: 'default' };
+            }
+        }
+    } catch (err) {
+        console.warn('[DATA] version.json topilmadi, manhwa.json ishlatiladi', err);
+    }
+    return { url: getManhwaUrl(), cache: 'no-store' };
+}
 // sliderInterval removed - auto-scroll disabled for now
 // let sliderInterval = null;
 
@@ -445,11 +460,11 @@ async function loadData() {
         }
     }
     
-    const fetchUrl = getManhwaUrl();
+    const { url: fetchUrl, cache: fetchCache } = await resolveManhwaUrl();
     try {
         console.log(`[DATA] Fetching ${fetchUrl}...`);
         const response = await fetch(fetchUrl, {
-            cache: 'no-store',
+            cache: fetchCache,
             headers: {
                 'Accept': 'application/json'
             }
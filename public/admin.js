@@ -6,6 +6,18 @@ const adminState = {
 };
 
 async function fetchManhwa() {
+  try {
+    const version = await fetch("/version.json", { cache: "no-store" });
+    if (version.ok) {
+      const { manhwa } = await version.json();
+      if (manhwa) {
+        const res = await fetch(manhwa);
+        if (res.ok) return res.json();
+      }
+    }
+  } catch (error) {
+    console.warn("version.json unavailable", error);
+  }
   const res = await fetch(`/manhwa.json?t=${Date.now()}`, {
     cache: "no-store",
     headers: { "Cache-Control": "no-store" },
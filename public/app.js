@@ -6,7 +6,11 @@ const state = {
   sort: "latest",
 };
 let lastFetchAt = 0;
+let libraryBody = "";
+let libraryUrl = "";
+let libraryRevision = null;
 const REFRESH_INTERVAL_MS = 5000;
+const detailCache = new Map();
 
 function resolveCoverPath(cover) {
   if (!cover) return "";
@@ -22,20 +26,132 @@ function getChapterBase(manhwaId, chapterNumber) {
   return `/manhwa/${manhwaId}/chapter-${chapterNumber}/`;
 }
 
-async function fetchManhwa() {
+async function fetchVersion() {
+  try {
+    const res = await fetch("/version.json", { cache: "no-store" });
+    if (!res.ok) return null;
+    return await res.json();
+  } catch (error) {
+    return null;
+  }
+}
+
+async function fetchLibrary() {
+  const version = await fetchVersion();
+  if (version?.library) {
+    if (version.library === libraryUrl) return null;
+    const revision = Number.isInteger(version.revision) ? version.revision : null;
+    if (libraryRevision !== null && revision > libraryRevision && version.changes) {
+      const items = await applyChanges(version.changes, libraryRevision, revision);
+      if (items) {
+        libraryUrl = version.library;
+        libraryRevision = revision;
+        return items;
+      }
+    }
+    const res = await fetch(version.library);
+    if (res.ok) {
+      const data = await res.json();
+      libraryUrl = version.library;
+      libraryRevision = revision;
+      return Array.isArray(data.manhwa) ? data.manhwa : [];
+    }
+  }
+  const res = await fetch("/library.json", { cache: "no-cache" });
+  if (res.ok) {
+    const body = await res.text();
+    if (body === libraryBody) return null;
+    libraryBody = body;
+    const data = JSON.parse(body);
+    return Array.isArray(data.manhwa) ? data.manhwa : [];
+  }
+  return fetchLegacyManhwa();
+}
+
+async function applyChanges(changesUrl, fromRevision, toRevision) {
+  const items = [...state.manhwas];
+  let revision = fromRevision;
+  try {
+    while (revision < toRevision) {
+      const res = await fetch(`${changesUrl}${revision}.json`);
+      if (!res.ok) return null;
+      const delta = await res.json();
+      if (delta.reset || !(delta.to > revision)) return null;
+      Object.entries(delta.manhwa || {}).forEach(([id, item]) => {
+        const index = items.findIndex((entry) => entry.id === id);
+        if (!item) {
+          if (index !== -1) items.splice(index, 1);
+        } else if (index === -1) {
+          items.push(item);
+        } else {
+          items[index] = item;
+        }
+      });
+      revision = delta.to;
+    }
+  } catch (error) {
+    return null;
+  }
+  return items;
+}
+
+async function fetchLegacyManhwa() {
   const res = await fetch(`/manhwa.json?t=${Date.now()}`, {
     cache: "no-store",
     headers: { "Cache-Control": "no-store" },
   });
   if (!res.ok) return [];
-  return res.json();
+  const data = await res.json();
+  if (!Array.isArray(data)) return [];
+  return data.map((item) => {
+    const detail = `legacy:${item.id}`;
+    detailCache.set(detail, Promise.resolve(item));
+    return {
+      ...item,
+      chapterCount: item.chapters?.length || 0,
+      latestChapter: getLatestChapterNumber(item),
+      detail,
+    };
+  });
+}
+
+function fetchJson(url) {
+  if (!detailCache.has(url)) {
+    const request = fetch(url).then((res) => {
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      return res.json();
+    });
+    request.catch(() => detailCache.delete(url));
+    detailCache.set(url, request);
+  }
+  return detailCache.get(url);
+}
+
+async function loadManhwaDetail(item) {
+  if (!item?.detail) return null;
+  try {
+    return await fetchJson(item.detail);
+  } catch (error) {
+    return null;
+  }
+}
+
+async function loadChapterPages(chapter) {
+  if (Array.isArray(chapter.pages)) return chapter.pages;
+  if (!chapter.pagesUrl) return [];
+  try {
+    const data = await fetchJson(chapter.pagesUrl);
+    return Array.isArray(data.pages) ? data.pages : [];
+  } catch (error) {
+    return [];
+  }
 }
 
 async function refreshManhwa(force = false) {
   const now = Date.now();
   if (!force && now - lastFetchAt < 1000) return;
   lastFetchAt = now;
-  const data = await fetchManhwa();
+  const data = await fetchLibrary();
   if (!Array.isArray(data)) return;
   state.manhwas = data;
   if (state.selectedManhwaId && !state.manhwas.find((item) => item.id === state.selectedManhwaId)) {
@@ -90,23 +206,25 @@ function renderIndex(manhwas) {
     card.appendChild(cover);
     card.appendChild(body);
     card.onclick = () => {
-      const latest = getLatestChapterNumber(item);
+      const latest = item.latestChapter;
       if (latest) {
         window.location.href = `/reader.html?slug=${item.id}&chapter=${latest}`;
         return;
       }
       state.selectedManhwaId = item.id;
       renderIndex(manhwas);
-      renderChapters(item);
-      updateIndexMeta(item);
     };
     grid.appendChild(card);
   });
 
   const selected = manhwas.find((item) => item.id === state.selectedManhwaId);
   if (selected) {
-    renderChapters(selected);
     updateIndexMeta(selected);
+    loadManhwaDetail(selected).then((detail) => {
+      if (detail && state.selectedManhwaId === selected.id) {
+        renderChapters(detail);
+      }
+    });
   }
 
   function renderChapters(manhwa) {
@@ -130,7 +248,7 @@ function renderIndex(manhwas) {
   }
 }
 
-function renderReader(manhwas) {
+async function renderReader(manhwas) {
   const readerTitle = document.getElementById("readerTitle");
   const readerMeta = document.getElementById("readerMeta");
   const pages = document.getElementById("pages");
@@ -138,16 +256,21 @@ function renderReader(manhwas) {
 
   const manhwaId = getQueryParam("slug") || getQueryParam("manhwa");
   const chapterNumber = getQueryParam("chapter");
-  const manhwa = manhwas.find((item) => item.id === manhwaId);
+  const item = manhwas.find((entry) => entry.id === manhwaId);
+  const manhwa = await loadManhwaDetail(item);
   if (!manhwa) {
     readerTitle.textContent = t("noData");
     return;
   }
-  const chapter = manhwa.chapters.find((ch) => String(ch.number) === String(chapterNumber));
-  if (!chapter) {
+  const chapterRef = manhwa.chapters.find((ch) => String(ch.number) === String(chapterNumber));
+  if (!chapterRef) {
     readerTitle.textContent = t("noData");
     return;
   }
+  const renderKey = chapterRef.pagesUrl || `${item.detail}#${chapterRef.number}`;
+  if (pages.dataset.renderKey === renderKey) return;
+  pages.dataset.renderKey = renderKey;
+  const chapter = { ...chapterRef, pages: await loadChapterPages(chapterRef) };
 
   readerTitle.textContent = manhwa.title;
   readerMeta.textContent = `${t("chapter")} ${chapter.number} • ${chapter.pages.length} ${t("pages")}`;
@@ -158,19 +281,45 @@ function renderReader(manhwas) {
   const immediateCount = Math.min(2, chapter.pages.length);
   const immediatePages = chapter.pages.slice(0, immediateCount);
   const deferredPages = chapter.pages.slice(immediateCount);
+  const pageWidths = Array.isArray(chapter.widths) ? chapter.widths : [];
+  const fullWidths = chapter.pageWidths && typeof chapter.pageWidths === "object" ? chapter.pageWidths : {};
+  const continuedPages = new Set(Array.isArray(chapter.continued) ? chapter.continued : []);
 
   const createPageImage = (page, { eager = false, highPriority = false } = {}) => {
     const img = document.createElement("img");
     img.alt = `${manhwa.title} ${chapter.number}`;
     img.decoding = "async";
     img.loading = "lazy";
+    if (continuedPages.has(page)) {
+      img.classList.add("page-continued");
+    }
     if (highPriority && "fetchPriority" in img) {
       img.fetchPriority = "high";
     }
     const src = `${chapterBase}${page}`;
+    const fallback = src.replace(/\.(webp|avif)$/i, ".jpg");
+    const fullWidth = fullWidths[page] || chapter.fullWidth;
+    const variantWidths = pageWidths.filter((width) => !fullWidth || width < fullWidth);
+    const srcset = variantWidths.length
+      ? [
+          ...variantWidths.map((width) => `${chapterBase}w${width}/${page} ${width}w`),
+          fullWidth ? `${src} ${fullWidth}w` : src,
+        ].join(", ")
+      : "";
+    if (srcset) {
+      img.sizes = "(min-width: 900px) 720px, 100vw";
+    }
+    if (fallback !== src) {
+      img.addEventListener("error", () => {
+        img.removeAttribute("srcset");
+        img.src = fallback;
+      }, { once: true });
+    }
     if (!observer || eager) {
+      if (srcset) img.srcset = srcset;
       img.src = src;
     } else {
+      if (srcset) img.dataset.srcset = srcset;
       img.dataset.src = src;
       observer.observe(img);
     }
@@ -220,6 +369,8 @@ document.addEventListener("DOMContentLoaded", async () => {
 
 window.addEventListener("langChanged", () => {
   if (!state.manhwas.length) return;
+  const pages = document.getElementById("pages");
+  if (pages) delete pages.dataset.renderKey;
   renderIndex(state.manhwas);
   renderReader(state.manhwas);
 });
@@ -270,8 +421,8 @@ function wireControls() {
 function applyFilters(manhwas) {
   const normalized = manhwas.map((item) => ({
     ...item,
-    chapterCount: item.chapters?.length || 0,
-    latestChapter: getLatestChapter(item),
+    chapterCount: item.chapterCount || 0,
+    latestChapterValue: parseFloat(item.latestChapter) || 0,
   }));
   let result = normalized;
   if (state.searchQuery) {
@@ -286,25 +437,17 @@ function applyFilters(manhwas) {
   if (state.filter === "recent") {
     result = result
       .slice()
-      .sort((a, b) => b.latestChapter - a.latestChapter)
+      .sort((a, b) => b.latestChapterValue - a.latestChapterValue)
       .slice(0, 10);
   }
   if (state.sort === "alpha") {
     result = result.slice().sort((a, b) => a.title.localeCompare(b.title));
   } else {
-    result = result.slice().sort((a, b) => b.latestChapter - a.latestChapter);
+    result = result.slice().sort((a, b) => b.latestChapterValue - a.latestChapterValue);
   }
   return result;
 }
 
-function getLatestChapter(manhwa) {
-  if (!manhwa.chapters || !manhwa.chapters.length) return 0;
-  const numbers = manhwa.chapters
-    .map((ch) => parseFloat(ch.number))
-    .filter((num) => !Number.isNaN(num));
-  return numbers.length ? Math.max(...numbers) : 0;
-}
-
 function getLatestChapterNumber(manhwa) {
   if (!manhwa.chapters || !manhwa.chapters.length) return null;
   const sorted = manhwa.chapters
@@ -355,6 +498,7 @@ function createLazyObserver() {
       entries.forEach((entry) => {
         if (!entry.isIntersecting) return;
         const img = entry.target;
+        if (img.dataset.srcset) img.srcset = img.dataset.srcset;
         img.src = img.dataset.src;
         observer.unobserve(img);
       });
@@ -367,7 +511,7 @@ function updateIndexMeta(manhwa) {
   if (!manhwa) return;
   setMeta({
     title: `${manhwa.title} • Manhwa`,
-    description: `${manhwa.title} — ${manhwa.status} • ${manhwa.chapters?.length || 0} chapters`,
+    description: `${manhwa.title} — ${manhwa.status} • ${manhwa.chapterCount || 0} chapters`,
     image: resolveCoverPath(manhwa.cover),
   });
 }
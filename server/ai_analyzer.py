@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from statistics import median
-from typing import List
+from typing import Dict, List, Tuple
 
 from PIL import Image, ImageStat
 
 
+ANALYSIS_MAX_SIDE = 1024
+CHROMA_TOLERANCE = 6
+CHROMA_MAX_FRACTION = 0.002
+_CHROMA_LUT = [255 if abs(value - 128) > CHROMA_TOLERANCE else 0 for value in range(256)]
+
+
 @dataclass
 class AnalysisResult:
     page_count: int
@@ -17,20 +23,27 @@ class AnalysisResult:
     blank_pages: List[Path]
     corrupted_pages: List[Path]
     possible_cover: bool
+    greyscale_pages: List[Path] = field(default_factory=list)
+    page_sizes: Dict[Path, Tuple[int, int]] = field(default_factory=dict)
 
 
 def analyze_images(image_paths: List[Path]) -> AnalysisResult:
     ratios: List[float] = []
     corrupted: List[Path] = []
     blanks: List[Path] = []
+    greyscale: List[Path] = []
+    sizes: Dict[Path, Tuple[int, int]] = {}
 
     for path in image_paths:
         try:
             with Image.open(path) as img:
-                img = img.convert("L")
+                sizes[path] = img.size
                 ratio = img.height / float(img.width)
+                view = _analysis_view(img)
                 ratios.append(ratio)
-                if _is_blank(img):
+                if _is_greyscale(view):
+                    greyscale.append(path)
+                if _is_blank(view.convert("L")):
                     blanks.append(path)
         except Exception:  # noqa: BLE001
             corrupted.append(path)
@@ -49,6 +62,8 @@ def analyze_images(image_paths: List[Path]) -> AnalysisResult:
         blank_pages=blanks,
         corrupted_pages=corrupted,
         possible_cover=possible_cover,
+        greyscale_pages=greyscale,
+        page_sizes=sizes,
     )
 
 
@@ -75,6 +90,25 @@ def _detect_cover(ratios: List[float]) -> bool:
     return abs(ratios[0] - med) >= 0.35
 
 
+def _analysis_view(img: Image.Image) -> Image.Image:
+    scale = max(img.size) // ANALYSIS_MAX_SIDE
+    if scale > 1:
+        img.draft("RGB", (img.width // scale, img.height // scale))
+    view = img if img.mode in {"L", "RGB"} else img.convert("RGB")
+    factor = max(view.size) // ANALYSIS_MAX_SIDE
+    if factor > 1:
+        view = view.reduce(factor)
+    return view
+
+
+def _is_greyscale(img: Image.Image) -> bool:
+    if img.mode == "L":
+        return True
+    _, blue, red = img.convert("YCbCr").split()
+    coloured = max(ImageStat.Stat(channel.point(_CHROMA_LUT)).mean[0] for channel in (blue, red))
+    return coloured / 255 <= CHROMA_MAX_FRACTION
+
+
 def _is_blank(img: Image.Image) -> bool:
     stat = ImageStat.Stat(img)
     mean = stat.mean[0]
@@ -24,6 +24,7 @@ from server import processor
 BACKFILL_STATE_PATH = DATA_DIR / "backfill_state.json"
 BACKFILL_LOG_PATH = DATA_DIR / "backfill_history.log"
 DEFAULT_SESSIONS_DIR = DATA_DIR / ".sessions"
+BACKFILL_COMMIT_BATCH = 25
 
 CHAPTER_KEYWORDS = (
     "bob",
@@ -524,9 +525,9 @@ async def _process_candidate(
     client,
     settings: dict,
     dry_run: bool,
-) -> None:
+) -> Optional[dict]:
     if dry_run:
-        return
+        return None
     source_ref = candidate.source_ref
     source_type = candidate.source_type
     temp_dir = Path(tempfile.mkdtemp(prefix="manhwa_backfill_"))
@@ -565,16 +566,49 @@ async def _process_candidate(
             False,
             "page-",
             3,
+            True,
         )
         _write_chapter_manifest(manhwa_id, chapter, result["pages"], candidate.metadata)
         _log_event(
             "chapter_ingested",
-            {"manhwa_id": manhwa_id, "chapter": chapter, "pages": result["pages_count"]},
+            {
+                "manhwa_id": manhwa_id,
+                "chapter": chapter,
+                "pages": result["pages_count"],
+                "passthrough": result["passthrough_count"],
+                "reused": result["reused_count"],
+                "transcoded": result["transcoded_count"],
+                "tiles": result["tile_count"],
+                "trimmed_pixels": result["trimmed_pixels"],
+                "downscaled": result["downscaled_count"],
+            },
         )
+        return result
     finally:
         shutil.rmtree(temp_dir, ignore_errors=True)
 
 
+async def _commit_chapters(manhwa_id: str, chapters: list[tuple[str, list[str], dict]]) -> None:
+    added = await asyncio.to_thread(
+        processor.add_chapters,
+        MANHWA_PATH,
+        manhwa_id,
+        chapters,
+        auto_deploy_enabled=False,
+        skip_existing=True,
+    )
+    added_numbers = {chapter["number"] for chapter in added}
+    for number, *_ in chapters:
+        if str(number) not in added_numbers:
+            _log_event("chapter_skipped", {"manhwa_id": manhwa_id, "chapter": number, "reason": "exists"})
+
+
+async def _commit_staged(staged: dict[str, list[tuple[str, list[str], dict]]]) -> None:
+    for manhwa_id, chapters in staged.items():
+        await _commit_chapters(manhwa_id, chapters)
+    await asyncio.to_thread(processor.flush_catalog, MANHWA_PATH)
+
+
 async def _scan_channel(
     client,
     channel: str,
@@ -943,18 +977,32 @@ async def run_backfill(dry_run: bool, apply: bool) -> None:
             with CHANNEL_CACHE_PATH.open("w", encoding="utf-8") as handle:
                 json.dump(merged_cache, handle, ensure_ascii=False, indent=2)
             settings = processor.load_settings(DATA_DIR / "settings.json")
-            for candidate in sorted(candidates, key=lambda c: _chapter_sort_key(c.chapter or "")):
-                if candidate.status != "ready" or not candidate.manhwa_id or not candidate.chapter:
-                    continue
-                await _process_candidate(
-                    candidate,
-                    candidate.manhwa_id,
-                    candidate.chapter,
-                    client,
-                    settings,
-                    dry_run=False,
-                )
-                existing_chapters.setdefault(candidate.manhwa_id, set()).add(candidate.chapter)
+            staged: dict[str, list[tuple[str, list[str], dict]]] = {}
+            try:
+                for candidate in sorted(candidates, key=lambda c: _chapter_sort_key(c.chapter or "")):
+                    if candidate.status != "ready" or not candidate.manhwa_id or not candidate.chapter:
+                        continue
+                    result = await _process_candidate(
+                        candidate,
+                        candidate.manhwa_id,
+                        candidate.chapter,
+                        client,
+                        settings,
+                        dry_run=False,
+                    )
+                    staged.setdefault(candidate.manhwa_id, []).append(
+                        (candidate.chapter, result["pages"], result.get("meta") or {})
+                    )
+                    if len(staged[candidate.manhwa_id]) >= BACKFILL_COMMIT_BATCH:
+                        await _commit_chapters(candidate.manhwa_id, staged.pop(candidate.manhwa_id))
+                    existing_chapters.setdefault(candidate.manhwa_id, set()).add(candidate.chapter)
+            except BaseException:
+                try:
+                    await _commit_staged(staged)
+                except Exception as exc:  # noqa: BLE001
+                    _log_event("commit_failed", {"manhwa_ids": sorted(staged), "error": repr(exc)})
+                raise
+            await _commit_staged(staged)
 
     if apply:
         _save_state(state)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from PIL import Image
+
+from server import image_tools, processor
+
+RESIZE_VARIANTS = ("baseline", "draft", "reducing_gap", "draft_reducing_gap")
+
+
+def build_catalog(titles: int, chapters: int, pages: int) -> List[Dict]:
+    catalog: List[Dict] = []
+    for index in range(titles):
+        manhwa_id = f"title-{index}"
+        catalog.append(
+            {
+                "id": manhwa_id,
+                "title": f"Title {index}",
+                "slug": manhwa_id,
+                "cover": f"/covers/{manhwa_id}.jpg",
+                "description": "",
+                "genres": ["action", "fantasy"],
+                "chapters": [
+                    {
+                        "id": f"{manhwa_id}-chapter-{number}",
+                        "number": str(number),
+                        "title": f"Chapter {number}",
+                        "pages": [f"{page:03d}.jpg" for page in range(1, pages + 1)],
+                        "createdAt": "2024-01-01T00:00:00",
+                    }
+                    for number in range(1, chapters + 1)
+                ],
+                "status": "ongoing",
+                "updatedAt": "2024-01-01T00:00:00",
+            }
+        )
+    return catalog
+
+
+def bench_catalog_load(titles: int, chapters: int, pages: int, repeat: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory(prefix="manhwa_bench_") as temp:
+        public_dir = Path(temp) / "public"
+        public_dir.mkdir()
+        legacy_path = public_dir / "legacy.json"
+        stamped_path = public_dir / "manhwa.json"
+        catalog = build_catalog(titles, chapters, pages)
+        legacy_path.write_text(json.dumps(catalog, ensure_ascii=False, indent=2), encoding="utf-8")
+        stamped = processor._ensure_schema(catalog, base_dir=Path(temp), public_dir=public_dir)
+        stamped_path.write_text(json.dumps(stamped, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        def legacy_load() -> None:
+            data = processor._read_manhwa_list(legacy_path)
+            processor._ensure_schema(data, base_dir=Path(temp), public_dir=public_dir)
+
+        def stamped_load() -> None:
+            processor._load_manhwa_file(stamped_path)
+
+        return {
+            "normalize_on_read": _best_of(legacy_load, repeat),
+            "schema_stamped": _best_of(stamped_load, repeat),
+        }
+
+
+def build_pages(directory: Path, width: int, height: int, count: int) -> List[Path]:
+    sources: List[Path] = []
+    gradient = Image.linear_gradient("L").resize((width, height))
+    for index in range(count):
+        noise = Image.effect_noise((width, height), 32 + index * 8)
+        page = Image.merge("RGB", (noise, gradient, noise.transpose(Image.FLIP_TOP_BOTTOM)))
+        path = directory / f"{index:03d}.jpg"
+        page.save(path, "JPEG", quality=92)
+        sources.append(path)
+    return sources
+
+
+def bench_page_resize(width: int, height: int, pages: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    with tempfile.TemporaryDirectory(prefix="manhwa_bench_") as temp:
+        sources = _in_fresh_process(build_pages, Path(temp), width, height, pages)
+        return {variant: _in_fresh_process(_time_resize, variant, sources, repeat) for variant in RESIZE_VARIANTS}
+
+
+def _in_fresh_process(func: Callable, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+
+def _time_resize(variant: str, sources: List[Path], repeat: int) -> Dict[str, float]:
+    import resource
+
+    timings = [_best_of(lambda: _resize_page(variant, source), repeat) for source in sources]
+    return {
+        "per_page_ms": statistics.mean(timings) * 1000,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _resize_page(variant: str, source: Path) -> None:
+    target = image_tools.MODE_WIDTHS["webtoon"]
+    with Image.open(source) as img:
+        if variant.startswith("draft"):
+            image_tools._draft_for_width(img, target)
+        page = img.convert("RGB")
+    reducing_gap = image_tools.RESIZE_REDUCING_GAP if variant.endswith("reducing_gap") else None
+    page.resize((target, int(page.height * target / page.width)), Image.LANCZOS, reducing_gap=reducing_gap)
+
+
+def _best_of(func: Callable[[], None], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the catalog and image pipeline.")
+    subparsers = parser.add_subparsers(dest="command")
+    catalog_parser = subparsers.add_parser("catalog-load", help="Time manhwa.json load with and without schema stamps.")
+    catalog_parser.add_argument("--titles", type=int, default=1000)
+    catalog_parser.add_argument("--chapters", type=int, default=50)
+    catalog_parser.add_argument("--pages", type=int, default=20)
+    catalog_parser.add_argument("--repeat", type=int, default=3)
+    resize_parser = subparsers.add_parser("page-resize", help="Time webtoon downscaling per decode/resize knob.")
+    resize_parser.add_argument("--width", type=int, default=2400)
+    resize_parser.add_argument("--height", type=int, default=12000)
+    resize_parser.add_argument("--pages", type=int, default=4)
+    resize_parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "catalog-load":
+        results = bench_catalog_load(args.titles, args.chapters, args.pages, args.repeat)
+        print(f"catalog: {args.titles} titles x {args.chapters} chapters x {args.pages} pages")
+        for name, seconds in results.items():
+            print(f"{name:>20}: {seconds * 1000:.1f} ms")
+        return
+    if args.command == "page-resize":
+        results = bench_page_resize(args.width, args.height, args.pages, args.repeat)
+        print(f"pages: {args.pages} x {args.width}x{args.height} JPEG -> {image_tools.MODE_WIDTHS['webtoon']} px")
+        for name, stats in results.items():
+            print(f"{name:>20}: {stats['per_page_ms']:.1f} ms/page, peak RSS {stats['peak_rss_mb']:.1f} MiB")
+        return
+    parser.print_help()
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,712 @@
+from __future__ import annotations
+
+import atexit
+import contextlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+Loader = Callable[[Path], List[Dict]]
+Persister = Callable[[Path, List[Dict], List["CatalogMutation"]], None]
+FileStamp = Tuple[int, int, int]
+Stamper = Callable[[Path], Any]
+
+CHAPTER_MEDIA_FIELDS = ("widths", "fullWidth", "pageWidths", "continued", "encoding", "downscaled")
+
+
+@dataclass
+class CatalogMutation:
+    kind: str
+    manhwa_id: str = ""
+    payload: Dict = field(default_factory=dict)
+
+
+class CatalogStore:
+    def __init__(self, path: Path, loader: Loader, stamp: Optional[Stamper] = None) -> None:
+        self.path = Path(path)
+        self.generation = 0
+        self.dirty = False
+        self._loader = loader
+        self._stamper = stamp or file_stamp
+        self._lock = threading.RLock()
+        self._entries: Optional[List[Dict]] = None
+        self._stamp: Any = None
+        self._by_id: Dict[str, Dict] = {}
+        self._chapters: Dict[str, Dict[str, Dict]] = {}
+
+    def entries(self) -> List[Dict]:
+        with self._lock:
+            self._refresh()
+            return list(self._entries or [])
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            self._refresh()
+            return [_copy_entry(entry) for entry in self._entries or []]
+
+    def get(self, manhwa_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._refresh()
+            return self._by_id.get(manhwa_id)
+
+    def get_chapter(self, manhwa_id: str, chapter_number: str) -> Optional[Dict]:
+        with self._lock:
+            self._refresh()
+            return self._chapters.get(manhwa_id, {}).get(str(chapter_number))
+
+    def chapter_numbers(self, manhwa_id: str) -> List[str]:
+        manhwa = self.get(manhwa_id)
+        if not manhwa:
+            return []
+        return [str(ch["number"]) for ch in manhwa.get("chapters", [])]
+
+    def replace(self, entries: List[Dict]) -> None:
+        with self._lock:
+            self._index(entries, self._stamper(self.path))
+
+    def apply(self, mutation: CatalogMutation) -> Any:
+        with self._lock:
+            self._refresh()
+            entries = list(self._entries or [])
+            result, touched = apply_mutation(entries, mutation)
+            if touched is None:
+                self._index(entries, self._stamp)
+            else:
+                self._entries = entries
+                self._reindex(touched)
+                self.generation += 1
+            self.dirty = True
+            return result
+
+    def mark_clean(self) -> None:
+        with self._lock:
+            self.dirty = False
+            self._stamp = self._stamper(self.path)
+
+    def stale(self) -> bool:
+        with self._lock:
+            return self._entries is not None and self._stamper(self.path) != self._stamp
+
+    def rebase(self, mutations: List[CatalogMutation]) -> List[CatalogMutation]:
+        with self._lock:
+            stamp = self._stamper(self.path)
+            entries = self._loader(self.path)
+            applied: List[CatalogMutation] = []
+            for mutation in mutations:
+                try:
+                    apply_mutation(entries, mutation)
+                except (KeyError, TypeError, ValueError) as exc:
+                    logging.warning(
+                        "Dropping %s for %s after reloading %s: %s",
+                        mutation.kind,
+                        mutation.manhwa_id or "-",
+                        self.path,
+                        exc,
+                    )
+                    continue
+                applied.append(mutation)
+            self._index(entries, stamp)
+            self.dirty = bool(applied)
+            return applied
+
+    def _refresh(self) -> None:
+        if self._entries is not None and self.dirty:
+            return
+        stamp = self._stamper(self.path)
+        if self._entries is not None and stamp is not None and stamp == self._stamp:
+            return
+        generation = self.generation
+        data = self._loader(self.path)
+        if self.generation == generation:
+            self._index(data, stamp)
+
+    def _index(self, entries: List[Dict], stamp: Any) -> None:
+        self._entries = entries
+        self._by_id = {}
+        self._chapters = {}
+        self._reindex({entry.get("id") for entry in entries if entry.get("id") is not None})
+        self._stamp = stamp
+        self.generation += 1
+
+    def _reindex(self, manhwa_ids: Set[str]) -> None:
+        for manhwa_id in manhwa_ids:
+            self._by_id.pop(manhwa_id, None)
+            self._chapters.pop(manhwa_id, None)
+        for entry in self._entries or []:
+            manhwa_id = entry.get("id")
+            if manhwa_id not in manhwa_ids or manhwa_id in self._by_id:
+                continue
+            self._by_id[manhwa_id] = entry
+            chapters: Dict[str, Dict] = {}
+            for chapter in entry.get("chapters") or []:
+                chapters.setdefault(str(chapter.get("number")), chapter)
+            self._chapters[manhwa_id] = chapters
+
+
+class CatalogLock:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file: Optional[IO[str]] = None
+
+    def __enter__(self) -> "CatalogLock":
+        self._lock.acquire()
+        try:
+            if self._depth == 0:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = self.path.open("a", encoding="utf-8")
+                _flock(self._file, blocking=True)
+        except BaseException:
+            self._lock.release()
+            raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            _funlock(self._file)
+        self._lock.release()
+
+
+class CatalogJournal:
+    def __init__(self, path: Path) -> None:
+        self.base_path = Path(path)
+        self.path = self.base_path.with_name(f"{self.base_path.stem}.{os.getpid()}{self.base_path.suffix}")
+        self._file: Optional[IO[str]] = None
+
+    def append(self, mutation: CatalogMutation) -> None:
+        file = self._open()
+        record = {"kind": mutation.kind, "manhwaId": mutation.manhwa_id, "payload": mutation.payload}
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+    def adopt(self) -> List[CatalogMutation]:
+        file = self._open()
+        file.seek(0)
+        lines = file.readlines()
+        candidates = sorted(self.base_path.parent.glob(f"{self.base_path.stem}.*{self.base_path.suffix}"))
+        for candidate in [self.base_path, *candidates]:
+            if candidate == self.path:
+                continue
+            orphan = _claim_orphan(candidate)
+            if orphan is None:
+                continue
+            with orphan:
+                orphaned = [line if line.endswith("\n") else line + "\n" for line in orphan.readlines()]
+                file.writelines(orphaned)
+                file.flush()
+                os.fsync(file.fileno())
+                candidate.unlink()
+            lines.extend(orphaned)
+        return _parse_journal(lines, self.path)
+
+    def reset(self) -> None:
+        if self._file is None:
+            return
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        if not os.fstat(self._file.fileno()).st_size:
+            self.path.unlink(missing_ok=True)
+        self._file.close()
+        self._file = None
+
+    def _open(self) -> IO[str]:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            file = self.path.open("a+", encoding="utf-8")
+            _flock(file, blocking=True)
+            self._file = file
+        return self._file
+
+
+def _claim_orphan(path: Path) -> Optional[IO[str]]:
+    try:
+        file = path.open("r", encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    if not _flock(file, blocking=False) or os.fstat(file.fileno()).st_nlink == 0:
+        file.close()
+        return None
+    return file
+
+
+def _parse_journal(lines: List[str], path: Path) -> List[CatalogMutation]:
+    mutations: List[CatalogMutation] = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            mutation = CatalogMutation(record["kind"], record.get("manhwaId") or "", record.get("payload") or {})
+        except (KeyError, TypeError, ValueError):
+            logging.warning("Skipping unreadable journal line %s in %s", number, path)
+            continue
+        mutations.append(mutation)
+    return mutations
+
+
+def _flock(file: IO[str], blocking: bool) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return True
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _funlock(file: IO[str]) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        return
+    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class CatalogWriter:
+    def __init__(
+        self,
+        store: CatalogStore,
+        persist: Persister,
+        flush_interval: float,
+        journal: Optional[CatalogJournal] = None,
+        compact_entries: int = 0,
+        lock: Optional[CatalogLock] = None,
+    ) -> None:
+        self.store = store
+        self.flush_interval = max(flush_interval, 0.0)
+        self.compact_entries = max(compact_entries, 0)
+        self._persist = persist
+        self._journal = journal
+        self._lock = lock
+        self._pending: List[CatalogMutation] = []
+        self._queue: "queue.Queue[Tuple[Optional[CatalogMutation], Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, mutation: CatalogMutation) -> Future:
+        future: Future = Future()
+        self._ensure_thread()
+        self._queue.put((mutation, future))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        future: Future = Future()
+        self._ensure_thread()
+        self._queue.put((None, future))
+        future.result(timeout)
+
+    def close(self) -> None:
+        if self._journal is not None and not self.store.dirty:
+            self._journal.close()
+
+    def replay(self) -> int:
+        if self._journal is None:
+            return 0
+        with self._locked():
+            mutations = self._journal.adopt()
+            replayed = 0
+            for mutation in mutations:
+                try:
+                    self.store.apply(mutation)
+                except (KeyError, TypeError, ValueError) as exc:
+                    logging.info("Skipping journaled %s for %s: %s", mutation.kind, mutation.manhwa_id or "-", exc)
+                    continue
+                self._pending.append(mutation)
+                replayed += 1
+            if replayed:
+                logging.info(
+                    "Replayed %s of %s journaled catalog mutations into %s",
+                    replayed,
+                    len(mutations),
+                    self._journal.path,
+                )
+                self._write()
+            elif mutations:
+                self._journal.reset()
+        return replayed
+
+    def _ensure_thread(self) -> None:
+        with self._thread_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"catalog-writer:{self.store.path.name}",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        deadline: Optional[float] = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                mutation, future = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                deadline = None if self._write() else time.monotonic() + max(self.flush_interval, 1.0)
+                continue
+            if mutation is None:
+                try:
+                    self._write(raise_errors=True)
+                    future.set_result(None)
+                except Exception as exc:  # noqa: BLE001
+                    future.set_exception(exc)
+                deadline = time.monotonic() + max(self.flush_interval, 1.0) if self.store.dirty else None
+                continue
+            try:
+                result = self.store.apply(mutation)
+            except Exception as exc:  # noqa: BLE001
+                future.set_exception(exc)
+                continue
+            self._pending.append(mutation)
+            error = self._journal_mutation(mutation)
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+            if self.compact_entries and len(self._pending) >= self.compact_entries:
+                deadline = None if self._write() else time.monotonic() + max(self.flush_interval, 1.0)
+            elif deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+
+    def _journal_mutation(self, mutation: CatalogMutation) -> Optional[Exception]:
+        if self._journal is None:
+            return None
+        try:
+            self._journal.append(mutation)
+        except Exception as exc:  # noqa: BLE001
+            logging.exception("Failed to journal catalog mutation for %s, writing through", self.store.path)
+            if self._write():
+                return None
+            self._discard(mutation)
+            return exc
+        return None
+
+    def _discard(self, mutation: CatalogMutation) -> None:
+        try:
+            with self._locked():
+                self._pending = self.store.rebase([pending for pending in self._pending if pending is not mutation])
+        except Exception:  # noqa: BLE001
+            logging.exception("Failed to roll back catalog mutation for %s", self.store.path)
+
+    def _locked(self) -> Any:
+        return self._lock if self._lock is not None else contextlib.nullcontext()
+
+    def _write(self, raise_errors: bool = False) -> bool:
+        if not self.store.dirty:
+            return True
+        try:
+            with self._locked():
+                if self.store.stale():
+                    self._pending = self.store.rebase(self._pending)
+                if self.store.dirty:
+                    self._persist(self.store.path, self.store.entries(), list(self._pending))
+                self._pending.clear()
+                self.store.mark_clean()
+        except Exception:  # noqa: BLE001
+            logging.exception("Failed to write catalog at %s", self.store.path)
+            if raise_errors:
+                raise
+            return False
+        if self._journal is not None:
+            try:
+                self._journal.reset()
+            except OSError:
+                logging.exception("Failed to reset catalog journal at %s", self._journal.path)
+        return True
+
+
+_STORES: Dict[str, CatalogStore] = {}
+_WRITERS: Dict[str, CatalogWriter] = {}
+_REGISTRY_LOCK = threading.RLock()
+
+
+def get_store(path: Path, loader: Loader, stamp: Optional[Stamper] = None) -> CatalogStore:
+    key = os.path.abspath(path)
+    with _REGISTRY_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = CatalogStore(Path(path), loader, stamp)
+            _STORES[key] = store
+        return store
+
+
+def open_stores() -> List[CatalogStore]:
+    with _REGISTRY_LOCK:
+        return list(_STORES.values())
+
+
+def get_writer(
+    store: CatalogStore,
+    persist: Persister,
+    flush_interval: float,
+    journal: Optional[CatalogJournal] = None,
+    compact_entries: int = 0,
+    lock: Optional[CatalogLock] = None,
+) -> CatalogWriter:
+    key = os.path.abspath(store.path)
+    with _REGISTRY_LOCK:
+        writer = _WRITERS.get(key)
+        if writer is None:
+            writer = CatalogWriter(store, persist, flush_interval, journal, compact_entries, lock)
+            writer.replay()
+            _WRITERS[key] = writer
+        return writer
+
+
+def flush_all(timeout: Optional[float] = None) -> None:
+    with _REGISTRY_LOCK:
+        writers = list(_WRITERS.values())
+    for writer in writers:
+        writer.flush(timeout)
+
+
+def _flush_at_exit() -> None:
+    try:
+        flush_all(timeout=30)
+    except Exception:  # noqa: BLE001
+        logging.exception("Failed to flush catalog on exit")
+        return
+    with _REGISTRY_LOCK:
+        writers = list(_WRITERS.values())
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(_flush_at_exit)
+
+
+def apply_mutation(entries: List[Dict], mutation: CatalogMutation) -> Tuple[Any, Optional[Set[str]]]:
+    handler = _MUTATIONS.get(mutation.kind)
+    if handler is None:
+        raise ValueError(f"Unknown catalog mutation: {mutation.kind}")
+    return handler(entries, mutation.manhwa_id, mutation.payload)
+
+
+def _replace(entries: List[Dict], manhwa_id: str, payload: Dict) -> Tuple[Any, Optional[Set[str]]]:
+    entries[:] = list(payload.get("entries") or [])
+    return len(entries), None
+
+
+def _add_manhwa(entries: List[Dict], manhwa_id: str, payload: Dict) -> Tuple[Any, Optional[Set[str]]]:
+    entry = dict(payload["entry"])
+    if _find(entries, entry["id"]) is not None:
+        raise ValueError("Manhwa already exists.")
+    entries.append(entry)
+    return entry, {entry["id"]}
+
+
+def _delete_manhwa(entries: List[Dict], manhwa_id: str, payload: Dict) -> Tuple[Any, Optional[Set[str]]]:
+    position = _find(entries, manhwa_id)
+    if position is None:
+        raise ValueError("Manhwa not found.")
+    return entries.pop(position), {manhwa_id}
+
+
+def _update_manhwa(entries: List[Dict], manhwa_id: str, payload: Dict) -> Tuple[Any, Optional[Set[str]]]:
+    position, entry = _writable(entries, manhwa_id)
+    entry.update(payload.get("fields") or {})
+    entry["updatedAt"] = payload["now"]
+    return entry, {manhwa_id}
+
+
+def _add_chapter(entries: List[Dict], manhwa_id: str, payload: Dict) -> Tuple[Any, Optional[Set[str]]]:
+    position, entry = _writable(entries, manhwa_id)
+    chapter_number = str(payload["number"])
+    index = next(
+        (i for i, chapter in enumerate(entry["chapters"]) if str(chapter.get("number")) == chapter_number),
+        None,
+    )
+    if index is not None and not payload.get("overwrite"):
+        raise ValueError("Chapter already exists.")
+    chapter = _put_chapter(
+        entry, manhwa_id, index, chapter_number, payload["pages"], payload.get("meta"), payload["now"]
+    )
+    return chapter, {manhwa_id}
+
+
+def _add_chapters(entries: List[Dict], manhwa_id: str, payload: Dict) -> Tuple[Any, Optional[Set[str]]]:
+    position, entry = _writable(entries, manhwa_id)
+    indexes: Dict[str, int] = {}
+    for index, chapter in enumerate(entry["chapters"]):
+        indexes.setdefault(str(chapter.get("number")), index)
+    added: List[Dict] = []
+    for item in payload["chapters"]:
+        chapter_number = str(item["number"])
+        index = indexes.get(chapter_number)
+        if index is not None and not payload.get("overwrite"):
+            if payload.get("skip_existing"):
+                continue
+            raise ValueError(f"Chapter {chapter_number} already exists.")
+        added.append(
+            _put_chapter(entry, manhwa_id, index, chapter_number, item["pages"], item.get("meta"), payload["now"])
+        )
+        if index is None:
+            indexes[chapter_number] = len(entry["chapters"]) - 1
+    return added, {manhwa_id}
+
+
+def _put_chapter(
+    entry: Dict,
+    manhwa_id: str,
+    index: Optional[int],
+    chapter_number: str,
+    pages: List[str],
+    meta: Optional[Dict],
+    now: str,
+) -> Dict:
+    chapters = entry["chapters"]
+    if index is None:
+        chapter = {
+            "id": f"{manhwa_id}-chapter-{chapter_number}",
+            "number": chapter_number,
+            "title": f"Chapter {chapter_number}",
+            "pages": list(pages),
+            "createdAt": now,
+        }
+        chapter.update(meta or {})
+        chapters.append(chapter)
+    else:
+        chapter = {key: value for key, value in chapters[index].items() if key not in CHAPTER_MEDIA_FIELDS}
+        chapter.update(
+            {
+                "id": chapter.get("id") or f"{manhwa_id}-chapter-{chapter_number}",
+                "number": chapter_number,
+                "title": chapter.get("title") or f"Chapter {chapter_number}",
+                "pages": list(pages),
+                "createdAt": chapter.get("createdAt") or now,
+            }
+        )
+        chapter.update(meta or {})
+        chapters[index] = chapter
+    entry["updatedAt"] = now
+    return chapter
+
+
+def _delete_chapter(entries: List[Dict], manhwa_id: str, payload: Dict) -> Tuple[Any, Optional[Set[str]]]:
+    position, entry = _writable(entries, manhwa_id)
+    chapter_number = str(payload["number"])
+    chapters = entry["chapters"]
+    remaining = [ch for ch in chapters if str(ch.get("number")) != chapter_number]
+    if len(remaining) == len(chapters):
+        raise ValueError("Chapter not found.")
+    entry["chapters"] = remaining
+    entry["updatedAt"] = payload["now"]
+    return len(chapters) - len(remaining), {manhwa_id}
+
+
+def _edit_pages(entries: List[Dict], manhwa_id: str, payload: Dict) -> Tuple[Any, Optional[Set[str]]]:
+    if _find(entries, manhwa_id) is None:
+        raise ValueError("Chapter not found.")
+    position, entry = _writable(entries, manhwa_id)
+    chapter_number = str(payload["number"])
+    now = payload["now"]
+    for index, chapter in enumerate(entry["chapters"]):
+        if str(chapter.get("number")) != chapter_number:
+            continue
+        chapter = dict(chapter)
+        chapter.setdefault("id", f"{manhwa_id}-chapter-{chapter_number}")
+        chapter.setdefault("title", f"Chapter {chapter_number}")
+        chapter.setdefault("createdAt", now)
+        existing = list(chapter.get("pages", []))
+        removed: Set[str] = set()
+        for name in payload.get("remove") or []:
+            if name in existing:
+                existing.remove(name)
+                removed.add(name)
+        pages = payload.get("pages") or []
+        if pages:
+            removed.update(set(existing) - set(pages))
+            chapter["pages"] = list(pages)
+        else:
+            chapter["pages"] = existing
+        if "meta" in payload:
+            chapter = {key: value for key, value in chapter.items() if key not in CHAPTER_MEDIA_FIELDS}
+            chapter.update(payload["meta"])
+        entry["updatedAt"] = now
+        if not chapter["pages"]:
+            del entry["chapters"][index]
+        else:
+            entry["chapters"][index] = chapter
+        return (list(chapter["pages"]), sorted(removed)), {manhwa_id}
+    raise ValueError("Chapter not found.")
+
+
+_MUTATIONS: Dict[str, Callable[[List[Dict], str, Dict], Tuple[Any, Optional[Set[str]]]]] = {
+    "replace": _replace,
+    "add_manhwa": _add_manhwa,
+    "delete_manhwa": _delete_manhwa,
+    "update_manhwa": _update_manhwa,
+    "add_chapter": _add_chapter,
+    "add_chapters": _add_chapters,
+    "delete_chapter": _delete_chapter,
+    "edit_pages": _edit_pages,
+}
+
+
+def _find(entries: List[Dict], manhwa_id: str) -> Optional[int]:
+    for position, entry in enumerate(entries):
+        if entry.get("id") == manhwa_id:
+            return position
+    return None
+
+
+def _writable(entries: List[Dict], manhwa_id: str) -> Tuple[int, Dict]:
+    position = _find(entries, manhwa_id)
+    if position is None:
+        raise ValueError("Manhwa not found.")
+    entry = dict(entries[position])
+    chapters = entry.get("chapters")
+    entry["chapters"] = list(chapters) if isinstance(chapters, list) else []
+    entries[position] = entry
+    return position, entry
+
+
+def file_stamp(path: Path) -> Optional[FileStamp]:
+    try:
+        result = os.stat(path)
+    except OSError:
+        return None
+    return (result.st_mtime_ns, result.st_size, result.st_ino)
+
+
+def _copy_entry(entry: Dict) -> Dict:
+    copied = dict(entry)
+    chapters = entry.get("chapters")
+    if isinstance(chapters, list):
+        copied["chapters"] = [_copy_chapter(chapter) for chapter in chapters]
+    genres = entry.get("genres")
+    if isinstance(genres, list):
+        copied["genres"] = list(genres)
+    return copied
+
+
+def _copy_chapter(chapter: Dict) -> Dict:
+    if not isinstance(chapter, dict):
+        return chapter
+    copied = dict(chapter)
+    pages = chapter.get("pages")
+    if isinstance(pages, list):
+        copied["pages"] = list(pages)
+    return copied
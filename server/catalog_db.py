@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .catalog import CatalogMutation, FileStamp, file_stamp
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS manhwa (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    cover TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    genres TEXT NOT NULL DEFAULT '[]',
+    status TEXT NOT NULL DEFAULT 'ongoing',
+    updated_at TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    manhwa_id TEXT NOT NULL REFERENCES manhwa(id) ON DELETE CASCADE,
+    number TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (manhwa_id, number)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    manhwa_id TEXT NOT NULL,
+    chapter_number TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (manhwa_id, chapter_number, position),
+    FOREIGN KEY (manhwa_id, chapter_number) REFERENCES chapters(manhwa_id, number) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS chapters_by_position ON chapters(manhwa_id, position);
+"""
+
+MANHWA_FIELDS = {"id", "title", "slug", "cover", "description", "genres", "chapters", "status", "updatedAt"}
+CHAPTER_FIELDS = {"id", "number", "title", "pages", "createdAt"}
+
+
+class SqliteCatalog:
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def stamp(self, path: Path) -> Optional[Tuple[Optional[FileStamp], Optional[FileStamp]]]:
+        main = file_stamp(self.db_path)
+        if main is None:
+            return None
+        return (main, file_stamp(self.db_path.with_name(self.db_path.name + "-wal")))
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            row = self._connection().execute("SELECT COUNT(*) FROM manhwa").fetchone()
+        return not row[0]
+
+    def load(self) -> List[Dict]:
+        with self._lock:
+            conn = self._connection()
+            pages: Dict[Tuple[str, str], List[str]] = {}
+            for manhwa_id, number, name in conn.execute(
+                "SELECT manhwa_id, chapter_number, name FROM pages ORDER BY manhwa_id, chapter_number, position"
+            ):
+                pages.setdefault((manhwa_id, number), []).append(name)
+            chapters: Dict[str, List[Dict]] = {}
+            for row in conn.execute(
+                "SELECT manhwa_id, number, id, title, created_at, extra FROM chapters ORDER BY manhwa_id, position"
+            ):
+                manhwa_id, number, chapter_id, title, created_at, extra = row
+                chapter = {
+                    "id": chapter_id,
+                    "number": number,
+                    "title": title,
+                    "pages": pages.get((manhwa_id, number), []),
+                    "createdAt": created_at,
+                }
+                chapter.update(json.loads(extra))
+                chapters.setdefault(manhwa_id, []).append(chapter)
+            entries: List[Dict] = []
+            for row in conn.execute(
+                "SELECT id, title, slug, cover, description, genres, status, updated_at, extra "
+                "FROM manhwa ORDER BY position"
+            ):
+                manhwa_id, title, slug, cover, description, genres, status, updated_at, extra = row
+                entry = {
+                    "id": manhwa_id,
+                    "title": title,
+                    "slug": slug,
+                    "cover": cover,
+                    "description": description,
+                    "genres": json.loads(genres),
+                    "chapters": chapters.get(manhwa_id, []),
+                    "status": status,
+                    "updatedAt": updated_at,
+                }
+                entry.update(json.loads(extra))
+                entries.append(entry)
+        return entries
+
+    def persist(self, entries: List[Dict], mutations: Iterable[CatalogMutation]) -> None:
+        by_id = {entry.get("id"): (position, entry) for position, entry in enumerate(entries)}
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for mutation in mutations:
+                    self._apply(conn, mutation, by_id, entries)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _apply(
+        self,
+        conn: sqlite3.Connection,
+        mutation: CatalogMutation,
+        by_id: Dict[str, Tuple[int, Dict]],
+        entries: List[Dict],
+    ) -> None:
+        if mutation.kind == "replace":
+            conn.execute("DELETE FROM manhwa")
+            for position, entry in enumerate(entries):
+                self._write_manhwa(conn, position, entry, with_chapters=True)
+            return
+        found = by_id.get(mutation.manhwa_id)
+        if found is None:
+            conn.execute("DELETE FROM manhwa WHERE id = ?", (mutation.manhwa_id,))
+            self._renumber_manhwa(conn, entries)
+            return
+        position, entry = found
+        self._write_manhwa(conn, position, entry, with_chapters=mutation.kind == "add_manhwa")
+        if mutation.kind == "add_manhwa":
+            self._renumber_manhwa(conn, entries)
+        if "number" in mutation.payload:
+            numbers = [str(mutation.payload["number"])]
+        else:
+            numbers = [str(item["number"]) for item in mutation.payload.get("chapters") or []]
+        if not numbers:
+            return
+        positions = {}
+        for chapter_position, chapter in enumerate(entry.get("chapters") or []):
+            positions.setdefault(str(chapter.get("number")), (chapter_position, chapter))
+        for number in numbers:
+            found_chapter = positions.get(number)
+            if found_chapter is not None:
+                self._write_chapter(conn, mutation.manhwa_id, found_chapter[0], found_chapter[1])
+                continue
+            conn.execute(
+                "DELETE FROM chapters WHERE manhwa_id = ? AND number = ?",
+                (mutation.manhwa_id, number),
+            )
+        conn.executemany(
+            "UPDATE chapters SET position = ? WHERE manhwa_id = ? AND number = ? AND position != ?",
+            [(index, mutation.manhwa_id, number, index) for number, (index, _) in positions.items()],
+        )
+
+    def _renumber_manhwa(self, conn: sqlite3.Connection, entries: List[Dict]) -> None:
+        conn.executemany(
+            "UPDATE manhwa SET position = ? WHERE id = ? AND position != ?",
+            [(position, entry.get("id"), position) for position, entry in enumerate(entries)],
+        )
+
+    def _write_manhwa(self, conn: sqlite3.Connection, position: int, entry: Dict, with_chapters: bool) -> None:
+        extra = {key: value for key, value in entry.items() if key not in MANHWA_FIELDS}
+        conn.execute(
+            "INSERT INTO manhwa (id, position, title, slug, cover, description, genres, status, updated_at, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET position = excluded.position, title = excluded.title, "
+            "slug = excluded.slug, cover = excluded.cover, description = excluded.description, "
+            "genres = excluded.genres, status = excluded.status, updated_at = excluded.updated_at, "
+            "extra = excluded.extra",
+            (
+                entry["id"],
+                position,
+                str(entry.get("title") or ""),
+                str(entry.get("slug") or entry["id"]),
+                str(entry.get("cover") or ""),
+                str(entry.get("description") or ""),
+                json.dumps(entry.get("genres") or [], ensure_ascii=False),
+                str(entry.get("status") or "ongoing"),
+                str(entry.get("updatedAt") or ""),
+                json.dumps(extra, ensure_ascii=False),
+            ),
+        )
+        if not with_chapters:
+            return
+        conn.execute("DELETE FROM chapters WHERE manhwa_id = ?", (entry["id"],))
+        for chapter_position, chapter in enumerate(entry.get("chapters") or []):
+            self._write_chapter(conn, entry["id"], chapter_position, chapter)
+
+    def _write_chapter(self, conn: sqlite3.Connection, manhwa_id: str, position: int, chapter: Dict) -> None:
+        number = str(chapter.get("number"))
+        extra = {key: value for key, value in chapter.items() if key not in CHAPTER_FIELDS}
+        conn.execute(
+            "INSERT INTO chapters (manhwa_id, number, position, id, title, created_at, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(manhwa_id, number) DO UPDATE SET position = excluded.position, id = excluded.id, "
+            "title = excluded.title, created_at = excluded.created_at, extra = excluded.extra",
+            (
+                manhwa_id,
+                number,
+                position,
+                str(chapter.get("id") or f"{manhwa_id}-chapter-{number}"),
+                str(chapter.get("title") or f"Chapter {number}"),
+                str(chapter.get("createdAt") or ""),
+                json.dumps(extra, ensure_ascii=False),
+            ),
+        )
+        conn.execute("DELETE FROM pages WHERE manhwa_id = ? AND chapter_number = ?", (manhwa_id, number))
+        conn.executemany(
+            "INSERT INTO pages (manhwa_id, chapter_number, position, name) VALUES (?, ?, ?, ?)",
+            [(manhwa_id, number, index, str(name)) for index, name in enumerate(chapter.get("pages") or [])],
+        )
+
+
+_DATABASES: Dict[str, SqliteCatalog] = {}
+_DATABASES_LOCK = threading.Lock()
+
+
+def open_catalog_db(db_path: Path) -> SqliteCatalog:
+    key = str(Path(db_path).resolve())
+    with _DATABASES_LOCK:
+        database = _DATABASES.get(key)
+        if database is None:
+            database = SqliteCatalog(Path(db_path))
+            _DATABASES[key] = database
+        return database
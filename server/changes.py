@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .catalog import CatalogMutation, file_stamp
+
+
+CHANGE_TYPES = {
+    "replace": "catalog_replaced",
+    "add_manhwa": "manhwa_added",
+    "delete_manhwa": "manhwa_removed",
+    "update_manhwa": "manhwa_updated",
+    "add_chapter": "chapter_added",
+    "add_chapters": "chapters_added",
+    "delete_chapter": "chapter_removed",
+    "edit_pages": "chapter_updated",
+}
+RETAINED_CHANGES = 1000
+
+
+class ChangeLog:
+    def __init__(self, path: Path, retained: int = RETAINED_CHANGES) -> None:
+        self.path = Path(path)
+        self.retained = max(retained, 1)
+        self._lock = threading.Lock()
+        self._changes: List[Dict] = []
+        self._revision = 0
+        self._stamp: Any = None
+        self._loaded = False
+
+    @property
+    def revision(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._revision
+
+    def record(self, mutations: List[CatalogMutation]) -> int:
+        with self._lock:
+            self._refresh()
+            now = datetime.utcnow().isoformat(timespec="seconds")
+            records: List[Dict] = []
+            for mutation in mutations:
+                self._revision += 1
+                records.append(_describe(self._revision, mutation, now))
+            if not records:
+                return self._revision
+            self._changes.extend(records)
+            if len(self._changes) > self.retained * 2:
+                self._changes = self._changes[-self.retained:]
+                self._rewrite()
+            else:
+                self._append(records)
+            self._stamp = file_stamp(self.path)
+            return self._revision
+
+    def since(self, revision: int) -> Optional[List[Dict]]:
+        with self._lock:
+            self._refresh()
+            if revision > self._revision:
+                return None
+            if revision == self._revision:
+                return []
+            oldest = self._changes[0]["rev"] if self._changes else self._revision + 1
+            if revision < oldest - 1:
+                return None
+            return [change for change in self._changes if change["rev"] > revision]
+
+    def _refresh(self) -> None:
+        stamp = file_stamp(self.path)
+        if self._loaded and stamp == self._stamp:
+            return
+        changes: List[Dict] = []
+        if stamp is not None:
+            try:
+                with self.path.open("r", encoding="utf-8") as file:
+                    for line in file:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            change = json.loads(line)
+                        except ValueError:
+                            logging.warning("Skipping malformed change record in %s", self.path)
+                            continue
+                        if isinstance(change, dict) and isinstance(change.get("rev"), int):
+                            changes.append(change)
+            except OSError:
+                logging.exception("Failed to read change log at %s", self.path)
+        self._changes = changes[-self.retained * 2:]
+        self._revision = max(self._revision, changes[-1]["rev"] if changes else 0)
+        self._stamp = stamp
+        self._loaded = True
+
+    def _append(self, records: List[Dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _rewrite(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with temp_path.open("w", encoding="utf-8") as file:
+            for record in self._changes:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        temp_path.replace(self.path)
+
+
+def _describe(revision: int, mutation: CatalogMutation, now: str) -> Dict:
+    change: Dict = {
+        "rev": revision,
+        "type": CHANGE_TYPES.get(mutation.kind, mutation.kind),
+        "manhwaId": mutation.manhwa_id or None,
+        "chapter": None,
+        "at": now,
+    }
+    number = mutation.payload.get("number")
+    if number is not None:
+        change["chapter"] = str(number)
+    if mutation.kind == "add_chapters":
+        change["chapters"] = [str(item["number"]) for item in mutation.payload.get("chapters") or []]
+    if mutation.kind == "update_manhwa":
+        change["fields"] = sorted(mutation.payload.get("fields") or {})
+    return change
+
+
+_LOGS: Dict[str, ChangeLog] = {}
+_LOGS_LOCK = threading.Lock()
+
+
+def open_change_log(path: Path) -> ChangeLog:
+    key = str(Path(path).resolve())
+    with _LOGS_LOCK:
+        change_log = _LOGS.get(key)
+        if change_log is None:
+            change_log = ChangeLog(Path(path))
+            _LOGS[key] = change_log
+        return change_log
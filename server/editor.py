@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import shutil
 from datetime import datetime
 from pathlib import Path
 from typing import List
 
-from .processor import delete_chapter, load_manhwa, save_manhwa
+from .catalog import CatalogMutation
+from .processor import chapter_media_meta, commit_catalog, get_chapter, trigger_deploy
 
 
 def update_chapter_pages(
@@ -15,41 +17,28 @@ def update_chapter_pages(
     pages: List[str],
     remove: List[str],
 ) -> List[str]:
-    manhwas = load_manhwa(manhwa_path)
     chapter_dir = public_dir / "manhwa" / manhwa_id / f"chapter-{chapter_number}"
-    for item in manhwas:
-        if item["id"] != manhwa_id:
-            continue
-        for chapter in item.get("chapters", []):
-            if str(chapter["number"]) != str(chapter_number):
-                continue
-            chapter.setdefault("id", f"{manhwa_id}-chapter-{chapter_number}")
-            chapter.setdefault("title", f"Chapter {chapter_number}")
-            chapter.setdefault("createdAt", datetime.utcnow().isoformat(timespec="seconds"))
-            existing = chapter.get("pages", [])
-            removed = set()
-            if remove:
-                for name in remove:
-                    if name in existing:
-                        existing.remove(name)
-                        removed.add(name)
-                    target = chapter_dir / name
-                    if target.exists():
-                        target.unlink()
-            if pages:
-                removed.update(set(existing) - set(pages))
-                chapter["pages"] = pages
-            else:
-                chapter["pages"] = existing
-            for name in removed:
-                target = chapter_dir / name
-                if target.exists():
-                    target.unlink()
-            if not chapter["pages"]:
-                delete_chapter(manhwa_path, public_dir, manhwa_id, chapter_number)
-                return []
-            item["updatedAt"] = datetime.utcnow().isoformat(timespec="seconds")
-            save_manhwa(manhwa_path, manhwas)
-            return chapter["pages"]
-    raise ValueError("Chapter not found.")
-
+    now = datetime.utcnow().isoformat(timespec="seconds")
+    chapter = get_chapter(manhwa_path, manhwa_id, chapter_number) or {}
+    kept = [name for name in chapter.get("pages") or [] if name not in set(remove or [])]
+    meta = chapter_media_meta(chapter_dir, chapter, list(pages or kept))
+    mutation = CatalogMutation(
+        "edit_pages",
+        manhwa_id,
+        {"number": str(chapter_number), "pages": pages, "remove": remove, "meta": meta, "now": now},
+    )
+    updated, removed = commit_catalog(manhwa_path, mutation, auto_deploy_enabled=False)
+    if not updated:
+        if chapter_dir.exists():
+            shutil.rmtree(chapter_dir, ignore_errors=True)
+        trigger_deploy()
+        return []
+    for name in set(removed) | set(remove or []):
+        for target in [chapter_dir / name, *chapter_dir.glob(f"w*/{name}")]:
+            if target.exists():
+                target.unlink()
+            fallback = target.with_suffix(".jpg")
+            if target.suffix.lower() in {".webp", ".avif"} and fallback.exists():
+                fallback.unlink()
+    trigger_deploy()
+    return updated
@@ -1,44 +1,599 @@
 from __future__ import annotations
 
+import io
+import math
+import shutil
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageStat, features
 
+from . import page_store
 
-def optimize_image(image_path: Path, mode: str) -> Path:
-    image_path = Path(image_path)
-    with Image.open(image_path) as img:
-        img = img.convert("RGB")
-        if mode == "webtoon":
-            img = _resize_width(img, 900)
-            img.save(image_path, "JPEG", quality=88, optimize=True, progressive=True)
-            return image_path
-        if mode == "smart":
-            img.save(image_path, "JPEG", quality=85, optimize=True, progressive=True)
-            return image_path
-        if mode == "lossless":
-            img.save(image_path, "JPEG", quality=100, optimize=False, progressive=False)
-            return image_path
-        img.save(image_path, "JPEG", quality=100, optimize=False, progressive=False)
-    return image_path
-
-
-def apply_dmca_guard(image_path: Path, text: str, opacity: float) -> None:
-    if not text or opacity <= 0:
+
+JPEG_OPTIONS = {
+    "webtoon": {"quality": 88, "optimize": True, "progressive": True},
+    "smart": {"quality": 85, "optimize": True, "progressive": True},
+    "lossless": {"quality": 100, "optimize": False, "progressive": False},
+    "original": {"quality": 100, "optimize": False, "progressive": False},
+}
+MODE_WIDTHS = {"webtoon": 900}
+MODERN_FORMATS = {
+    "webp": ("WEBP", ".webp", {"quality": 82, "method": 6}),
+    "avif": ("AVIF", ".avif", {"quality": 60, "speed": 6}),
+}
+TARGET_FORMATS = {
+    "target": ("JPEG", ".jpg", {"optimize": True, "progressive": True}, 85, "smart"),
+    "target_webp": ("WEBP", ".webp", {"method": 4}, 82, "webp"),
+}
+TARGET_QUALITIES = (40, 50, 60, 65, 70, 75, 80, 85, 90, 95)
+TARGET_SSIM = 0.985
+TARGET_PLANE_WIDTH = 480
+SSIM_BLOCK = 8
+PASSTHROUGH_MODES = {"original", "lossless"}
+STRIPPED_JPEG_MARKERS = {0xE1, 0xED, 0xFE}
+GUTTER_TOLERANCE = 8
+TRIM_DEVIATION = 8.0
+TRIM_MIN_FRACTION = 0.02
+TRIM_ARTIFACT_FRACTION = 0.02
+TRIM_SCAN_SIDE = 2048
+STRIP_RATIO = 1.6
+RESIZE_REDUCING_GAP = 3.0
+WATERMARK_BUCKET_WIDTH = 900
+WATERMARK_MARGIN = 12
+
+_TRACK_PEAK_RSS = False
+
+
+@dataclass
+class PageResult:
+    name: str
+    width: int
+    passthrough: bool = False
+    reused: bool = False
+    tiles: Tuple[str, ...] = ()
+    saved_bytes: int = 0
+    peak_rss_mb: float = 0.0
+    greyscale: bool = False
+    trimmed_pixels: int = 0
+    downscaled: bool = False
+
+
+@lru_cache(maxsize=None)
+def avif_supported() -> bool:
+    if "avif" in features.get_supported_modules():
+        return True
+    try:
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def numpy_available() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_mode(mode: str) -> str:
+    if mode == "avif" and not avif_supported():
+        return "webp"
+    if mode in TARGET_FORMATS and not numpy_available():
+        return TARGET_FORMATS[mode][4]
+    return mode
+
+
+def page_extension(mode: str) -> str:
+    mode = resolve_mode(mode)
+    if mode in MODERN_FORMATS:
+        return MODERN_FORMATS[mode][1]
+    if mode in TARGET_FORMATS:
+        return TARGET_FORMATS[mode][1]
+    return ".jpg"
+
+
+def page_size(source: Path) -> Tuple[int, int]:
+    try:
+        with Image.open(source) as img:
+            return img.size
+    except Exception:  # noqa: BLE001
+        return (0, 0)
+
+
+def convert_page(
+    source: Path,
+    output_path: Path,
+    mode: str,
+    dmca_text: str,
+    dmca_opacity: float,
+    jpeg_fallback: bool = False,
+    widths: Sequence[int] = (),
+    max_bytes: int = 0,
+    max_width: int = 0,
+    strip_metadata: bool = False,
+    store_dir: Optional[Path] = None,
+    tile_height: int = 0,
+    target_ssim: float = TARGET_SSIM,
+    greyscale: bool = False,
+    trim_padding: Optional[int] = None,
+    max_pixels: int = 0,
+) -> PageResult:
+    source = Path(source)
+    output_path = Path(output_path)
+    mode = resolve_mode(mode)
+    output_path.unlink(missing_ok=True)
+    _reset_peak_rss()
+    width, height = page_size(source)
+    if mode in PASSTHROUGH_MODES or width * height <= max_pixels:
+        max_pixels = 0
+    key = None
+    if store_dir is not None:
+        key = page_store.source_key(
+            source,
+            mode,
+            dmca_text,
+            dmca_opacity,
+            max_bytes,
+            max_width,
+            strip_metadata,
+            target_ssim,
+            greyscale,
+            trim_padding if trim_padding is None else (trim_padding, TRIM_DEVIATION),
+            *((max_pixels,) if max_pixels else ()),
+        )
+        reusable = not widths and not jpeg_fallback and not tile_height
+        if reusable and page_store.fetch(store_dir, key, output_path):
+            with Image.open(output_path) as img:
+                return PageResult(
+                    output_path.name,
+                    img.width,
+                    reused=True,
+                    peak_rss_mb=_peak_rss_mb(),
+                    downscaled=bool(max_pixels),
+                )
+    result = _convert_page(
+        source,
+        output_path,
+        mode,
+        dmca_text,
+        dmca_opacity,
+        jpeg_fallback,
+        widths,
+        max_bytes,
+        max_width,
+        strip_metadata,
+        tile_height,
+        target_ssim,
+        greyscale,
+        trim_padding,
+        max_pixels,
+    )
+    if store_dir is not None:
+        for name in result.tiles or (result.name,):
+            page_store.intern(store_dir, output_path.with_name(name), None if result.tiles else key)
+            for width in widths:
+                variant_path = output_path.parent / f"w{width}" / name
+                if variant_path.exists():
+                    page_store.intern(store_dir, variant_path)
+    result.peak_rss_mb = _peak_rss_mb()
+    return result
+
+
+def track_peak_rss() -> None:
+    global _TRACK_PEAK_RSS
+    _TRACK_PEAK_RSS = True
+
+
+def _reset_peak_rss() -> None:
+    if not _TRACK_PEAK_RSS:
         return
-    image_path = Path(image_path)
-    with Image.open(image_path) as img:
-        img = img.convert("RGBA")
-        watermark = Image.new("RGBA", img.size, (255, 255, 255, 0))
-        draw = ImageDraw.Draw(watermark)
-        font = ImageFont.load_default()
-        text_width, text_height = draw.textsize(text, font=font)
-        position = (img.width - text_width - 12, img.height - text_height - 12)
-        alpha = int(255 * min(max(opacity, 0.0), 1.0))
-        draw.text(position, text, fill=(255, 255, 255, alpha), font=font)
-        combined = Image.alpha_composite(img, watermark).convert("RGB")
-        combined.save(image_path, "JPEG", quality=95, optimize=True)
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _convert_page(
+    source: Path,
+    output_path: Path,
+    mode: str,
+    dmca_text: str,
+    dmca_opacity: float,
+    jpeg_fallback: bool,
+    widths: Sequence[int],
+    max_bytes: int,
+    max_width: int,
+    strip_metadata: bool,
+    tile_height: int,
+    target_ssim: float,
+    greyscale: bool,
+    trim_padding: Optional[int],
+    max_pixels: int,
+) -> PageResult:
+    watermark = bool(dmca_text) and dmca_opacity > 0
+    box = None
+    with Image.open(source) as img:
+        source_width, source_height = img.size
+        passthrough = (
+            not watermark
+            and not max_pixels
+            and not _needs_tiling(img.height, tile_height)
+            and _can_pass_through(img, source, mode, max_bytes, max_width)
+        )
+        if passthrough and trim_padding is not None:
+            box = trim_box(img, trim_padding)
+            passthrough = box is None
+        if passthrough:
+            _copy_jpeg(source, output_path, strip_metadata and img.getexif().get(0x0112, 1) == 1)
+            if not any(width < img.width for width in widths):
+                return PageResult(output_path.name, img.width, True)
+        if mode in MODE_WIDTHS or max_pixels:
+            _draft_for_width(img, MODE_WIDTHS.get(mode, 0), max_pixels)
+        img.load()
+        page = img if img.mode == "RGB" else img.convert("RGB")
+    if max_pixels and page.width * page.height > max_pixels:
+        page = page.reduce(math.ceil(math.sqrt(page.width * page.height / max_pixels)))
+    scale = page.width / source_width
+    if box is not None:
+        box = _scale_box(box, scale, page.size)
+    elif trim_padding is not None and not passthrough:
+        box = trim_box(page, round(trim_padding * scale))
+    trimmed = 0
+    if box is not None:
+        kept = (box[2] - box[0]) * (box[3] - box[1]) / (scale * scale)
+        trimmed = max(source_width * source_height - round(kept), 0)
+        page = page.crop(box)
+    if mode in MODE_WIDTHS:
+        page = _resize_width(page, MODE_WIDTHS[mode])
+    if watermark:
+        page = _apply_watermark(page, dmca_text, dmca_opacity)
+    if greyscale:
+        page = page.convert("L")
+    bounds = tile_bounds(page, tile_height)
+    if len(bounds) == 1:
+        saved = 0
+        if not passthrough:
+            saved = _save_page(page, output_path, mode, jpeg_fallback, target_ssim)
+        _save_widths(page, output_path, mode, jpeg_fallback, widths, target_ssim)
+        return PageResult(
+            output_path.name,
+            page.width,
+            passthrough,
+            saved_bytes=saved,
+            greyscale=greyscale and not passthrough,
+            trimmed_pixels=trimmed,
+            downscaled=bool(max_pixels),
+        )
+    tiles: List[str] = []
+    saved = 0
+    for index, (top, bottom) in enumerate(bounds, start=1):
+        tile_path = output_path.with_name(f"{output_path.stem}-{index:02d}{output_path.suffix}")
+        tile = page.crop((0, top, page.width, bottom))
+        saved += _save_page(tile, tile_path, mode, jpeg_fallback, target_ssim)
+        _save_widths(tile, tile_path, mode, jpeg_fallback, widths, target_ssim)
+        tiles.append(tile_path.name)
+    return PageResult(
+        output_path.name,
+        page.width,
+        tiles=tuple(tiles),
+        saved_bytes=saved,
+        greyscale=greyscale,
+        trimmed_pixels=trimmed,
+        downscaled=bool(max_pixels),
+    )
+
+
+def _save_widths(
+    page: Image.Image,
+    output_path: Path,
+    mode: str,
+    jpeg_fallback: bool,
+    widths: Sequence[int],
+    target_ssim: float,
+) -> None:
+    for width in widths:
+        if width >= page.width:
+            continue
+        variant_path = output_path.parent / f"w{width}" / output_path.name
+        variant_path.parent.mkdir(parents=True, exist_ok=True)
+        _save_page(_resize_width(page, width), variant_path, mode, jpeg_fallback, target_ssim)
+
+
+def trim_box(img: Image.Image, padding: int) -> Optional[Tuple[int, int, int, int]]:
+    content = _content_box(img.convert("L"))
+    if content is None:
+        return None
+    left, top, right, bottom = content
+    if img.height / img.width >= STRIP_RATIO:
+        left, right = 0, img.width
+    box = (
+        max(left - padding, 0),
+        max(top - padding, 0),
+        min(right + padding, img.width),
+        min(bottom + padding, img.height),
+    )
+    kept = (box[2] - box[0]) * (box[3] - box[1])
+    if kept >= img.width * img.height * (1 - TRIM_MIN_FRACTION):
+        return None
+    return box
+
+
+def _content_box(gray: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    if gray.width < 2 or gray.height < 2:
+        return None
+    try:
+        import numpy
+    except ImportError:
+        factor = max(math.ceil(max(gray.size) / TRIM_SCAN_SIDE), 1)
+        view = gray.reduce(factor) if factor > 1 else gray
+        contrast = _local_contrast(view)
+        rows = [ImageStat.Stat(contrast.crop((0, y, view.width, y + 1))).rms[0] for y in range(view.height)]
+        columns = [ImageStat.Stat(contrast.crop((x, 0, x + 1, view.height))).rms[0] for x in range(view.width)]
+    else:
+        factor = 1
+        pixels = numpy.asarray(gray, dtype=numpy.float32)
+        contrast = numpy.zeros_like(pixels)
+        contrast[:, 1:] = numpy.abs(numpy.diff(pixels, axis=1))
+        contrast[1:, :] = numpy.maximum(contrast[1:, :], numpy.abs(numpy.diff(pixels, axis=0)))
+        contrast *= contrast
+        rows = numpy.sqrt(contrast.mean(axis=1)).tolist()
+        columns = numpy.sqrt(contrast.mean(axis=0)).tolist()
+    row_span = _content_span([deviation > TRIM_DEVIATION for deviation in rows])
+    column_span = _content_span([deviation > TRIM_DEVIATION for deviation in columns])
+    if row_span is None or column_span is None:
+        return None
+    return (
+        column_span[0] * factor,
+        row_span[0] * factor,
+        min(column_span[1] * factor, gray.width),
+        min(row_span[1] * factor, gray.height),
+    )
+
+
+def _local_contrast(view: Image.Image) -> Image.Image:
+    width, height = view.size
+    horizontal = Image.new("L", view.size)
+    vertical = Image.new("L", view.size)
+    left, right = view.crop((0, 0, width - 1, height)), view.crop((1, 0, width, height))
+    top, bottom = view.crop((0, 0, width, height - 1)), view.crop((0, 1, width, height))
+    horizontal.paste(ImageChops.difference(right, left), (1, 0))
+    vertical.paste(ImageChops.difference(bottom, top), (0, 1))
+    return ImageChops.lighter(horizontal, vertical)
+
+
+def _content_span(active: Sequence[bool]) -> Optional[Tuple[int, int]]:
+    runs: List[Tuple[int, int]] = []
+    start = None
+    for index, flag in enumerate(active):
+        if flag and start is None:
+            start = index
+        elif not flag and start is not None:
+            runs.append((start, index))
+            start = None
+    if start is not None:
+        runs.append((start, len(active)))
+    artifact = len(active) * TRIM_ARTIFACT_FRACTION
+    if len(runs) > 1 and runs[0][1] <= artifact:
+        runs.pop(0)
+    if len(runs) > 1 and runs[-1][0] >= len(active) - artifact:
+        runs.pop()
+    if not runs:
+        return None
+    return runs[0][0], runs[-1][1]
+
+
+def _scale_box(box: Tuple[int, int, int, int], scale: float, size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    if scale == 1:
+        return box
+    left, top, right, bottom = (round(value * scale) for value in box)
+    return (left, top, min(right, size[0]), min(bottom, size[1]))
+
+
+def tile_bounds(page: Image.Image, tile_height: int) -> List[Tuple[int, int]]:
+    if not _needs_tiling(page.height, tile_height):
+        return [(0, page.height)]
+    bounds: List[Tuple[int, int]] = []
+    top = 0
+    while _needs_tiling(page.height - top, tile_height):
+        cut = _gutter_row(page, top + tile_height, tile_height // 4)
+        bounds.append((top, cut))
+        top = cut
+    bounds.append((top, page.height))
+    return bounds
+
+
+def _needs_tiling(height: int, tile_height: int) -> bool:
+    return tile_height > 0 and height > tile_height * 3 // 2
+
+
+def _gutter_row(page: Image.Image, target: int, window: int) -> int:
+    low = target - window
+    high = min(target + window, page.height - 1)
+    spans = _row_spans(page.crop((0, low, page.width, high)).convert("L"))
+    gutters = [low + offset for offset, span in enumerate(spans) if span <= GUTTER_TOLERANCE]
+    if not gutters:
+        return target
+    return min(gutters, key=lambda row: abs(row - target))
+
+
+def _row_spans(band: Image.Image) -> List[int]:
+    try:
+        import numpy
+    except ImportError:
+        rows = (band.crop((0, row, band.width, row + 1)).getextrema() for row in range(band.height))
+        return [high - low for low, high in rows]
+    pixels = numpy.asarray(band)
+    return (pixels.max(axis=1).astype(int) - pixels.min(axis=1)).tolist()
+
+
+def _can_pass_through(img: Image.Image, source: Path, mode: str, max_bytes: int, max_width: int) -> bool:
+    if img.format != "JPEG":
+        return False
+    if mode == "original":
+        return True
+    if mode not in PASSTHROUGH_MODES or img.mode not in {"RGB", "L"}:
+        return False
+    if max_width and img.width > max_width:
+        return False
+    return not max_bytes or source.stat().st_size <= max_bytes
+
+
+def _copy_jpeg(source: Path, output_path: Path, strip_metadata: bool) -> None:
+    if not strip_metadata:
+        shutil.copyfile(source, output_path)
+        return
+    output_path.write_bytes(_strip_jpeg_metadata(source.read_bytes()))
+
+
+def _strip_jpeg_metadata(data: bytes) -> bytes:
+    if data[:2] != b"\xff\xd8":
+        return data
+    kept = [data[:2]]
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return data
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker in {0xDA, 0xD9}:
+            break
+        length = int.from_bytes(data[position + 2 : position + 4], "big")
+        end = position + 2 + length
+        if length < 2 or end > len(data):
+            return data
+        if marker not in STRIPPED_JPEG_MARKERS:
+            kept.append(data[position:end])
+        position = end
+    kept.append(data[position:])
+    return b"".join(kept)
+
+
+def _save_page(
+    page: Image.Image,
+    output_path: Path,
+    mode: str,
+    jpeg_fallback: bool,
+    target_ssim: float = TARGET_SSIM,
+) -> int:
+    output_path.unlink(missing_ok=True)
+    saved = 0
+    if mode in TARGET_FORMATS:
+        saved = _save_targeted(page, output_path, mode, target_ssim)
+    elif mode in MODERN_FORMATS:
+        image_format, extension, options = MODERN_FORMATS[mode]
+        page.save(output_path, image_format, **options)
+    else:
+        page.save(output_path, "JPEG", **JPEG_OPTIONS.get(mode, JPEG_OPTIONS["original"]))
+    if jpeg_fallback and output_path.suffix != ".jpg":
+        output_path.with_suffix(".jpg").unlink(missing_ok=True)
+        page.save(output_path.with_suffix(".jpg"), "JPEG", **JPEG_OPTIONS["smart"])
+    return saved
+
+
+def _save_targeted(page: Image.Image, output_path: Path, mode: str, threshold: float) -> int:
+    image_format, extension, options, baseline, fallback_mode = TARGET_FORMATS[mode]
+    reference = _luma_plane(page)
+    encoded: Dict[int, bytes] = {}
+
+    def encode(quality: int) -> bytes:
+        if quality not in encoded:
+            buffer = io.BytesIO()
+            page.save(buffer, image_format, quality=quality, **options)
+            encoded[quality] = buffer.getvalue()
+        return encoded[quality]
+
+    low, high = 0, len(TARGET_QUALITIES) - 1
+    while low < high:
+        middle = (low + high) // 2
+        with Image.open(io.BytesIO(encode(TARGET_QUALITIES[middle]))) as candidate:
+            score = _ssim(reference, _luma_plane(candidate))
+        if score >= threshold:
+            high = middle
+        else:
+            low = middle + 1
+    body = encode(TARGET_QUALITIES[low])
+    output_path.write_bytes(body)
+    return len(encode(baseline)) - len(body)
+
+
+def _luma_plane(img: Image.Image):
+    import numpy
+
+    factor = math.ceil(img.width / TARGET_PLANE_WIDTH)
+    if factor > 1:
+        img = img.reduce(factor)
+    return numpy.asarray(img.convert("L"), dtype=numpy.float64)
+
+
+def _ssim(reference, candidate) -> float:
+    height = reference.shape[0] // SSIM_BLOCK * SSIM_BLOCK
+    width = reference.shape[1] // SSIM_BLOCK * SSIM_BLOCK
+    if not height or not width:
+        return 1.0
+    shape = (height // SSIM_BLOCK, SSIM_BLOCK, width // SSIM_BLOCK, SSIM_BLOCK)
+    a = reference[:height, :width].reshape(shape)
+    b = candidate[:height, :width].reshape(shape)
+    mean_a = a.mean(axis=(1, 3))
+    mean_b = b.mean(axis=(1, 3))
+    var_a = a.var(axis=(1, 3))
+    var_b = b.var(axis=(1, 3))
+    covariance = (a * b).mean(axis=(1, 3)) - mean_a * mean_b
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    scores = ((2 * mean_a * mean_b + c1) * (2 * covariance + c2)) / (
+        (mean_a**2 + mean_b**2 + c1) * (var_a + var_b + c2)
+    )
+    return float(scores.mean())
+
+
+def _apply_watermark(img: Image.Image, text: str, opacity: float) -> Image.Image:
+    scale = max(img.width // WATERMARK_BUCKET_WIDTH, 1)
+    overlay = _watermark_overlay(text, int(255 * min(max(opacity, 0.0), 1.0)), scale)
+    position = (
+        img.width - overlay.width - WATERMARK_MARGIN * scale,
+        img.height - overlay.height - WATERMARK_MARGIN * scale,
+    )
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    img.paste(overlay, position, overlay)
+    return img
+
+
+@lru_cache(maxsize=32)
+def _watermark_overlay(text: str, alpha: int, scale: int) -> Image.Image:
+    font = ImageFont.load_default()
+    left, top, right, bottom = _text_box(text, font)
+    overlay = Image.new("RGBA", (max(right - left, 1), max(bottom - top, 1)), (255, 255, 255, 0))
+    ImageDraw.Draw(overlay).text((-left, -top), text, fill=(255, 255, 255, alpha), font=font)
+    if scale > 1:
+        overlay = overlay.resize((overlay.width * scale, overlay.height * scale), Image.NEAREST)
+    return overlay
+
+
+def _text_box(text: str, font) -> Tuple[int, int, int, int]:
+    return ImageDraw.Draw(Image.new("L", (1, 1))).textbbox((0, 0), text, font=font)
 
 
 def generate_cover(
@@ -52,7 +607,7 @@ def generate_cover(
     if source_image and source_image.exists():
         with Image.open(source_image) as img:
             img = img.convert("RGB")
-            img = img.resize(size, Image.LANCZOS)
+            img = img.resize(size, Image.LANCZOS, reducing_gap=RESIZE_REDUCING_GAP)
             img.save(output_path, "JPEG", quality=95, optimize=True)
             return output_path
 
@@ -60,8 +615,8 @@ def generate_cover(
     draw = ImageDraw.Draw(cover)
     font = ImageFont.load_default()
     text = title.strip() or "New Manhwa"
-    text_width, text_height = draw.textsize(text, font=font)
-    position = ((size[0] - text_width) // 2, (size[1] - text_height) // 2)
+    left, top, right, bottom = _text_box(text, font)
+    position = ((size[0] - right - left) // 2, (size[1] - bottom - top) // 2)
     draw.text(position, text, fill=(235, 235, 235), font=font)
     cover.save(output_path, "JPEG", quality=95, optimize=True)
     return output_path
@@ -72,5 +627,17 @@ def _resize_width(img: Image.Image, target_width: int) -> Image.Image:
         return img
     ratio = target_width / float(img.width)
     height = int(img.height * ratio)
-    return img.resize((target_width, height), Image.LANCZOS)
+    return img.resize((target_width, height), Image.LANCZOS, reducing_gap=RESIZE_REDUCING_GAP)
+
+
+def _draft_for_width(img: Image.Image, target_width: int, max_pixels: int = 0) -> None:
+    if img.format != "JPEG":
+        return
+    scale = img.width // target_width if target_width else 1
+    budget_scale = 1
+    while max_pixels and budget_scale < 8 and (img.width // budget_scale) * (img.height // budget_scale) > max_pixels:
+        budget_scale *= 2
+    scale = max(scale, budget_scale)
+    if scale >= 2:
+        img.draft(img.mode, (img.width // scale, img.height // scale))
 
@@ -4,7 +4,7 @@ from collections import Counter
 from pathlib import Path
 from typing import Dict, List
 
-from .processor import load_manhwa
+from .processor import get_manhwa_list
 
 
 def generate_insights(logs: List[Dict], manhwa_path: Path) -> str:
@@ -17,7 +17,7 @@ def generate_insights(logs: List[Dict], manhwa_path: Path) -> str:
         parts = log.get("action", "").split("-")
         if len(parts) >= 2:
             by_manhwa[parts[-1].strip()] += 1
-    for manhwa in load_manhwa(manhwa_path):
+    for manhwa in get_manhwa_list(manhwa_path):
         for chapter in manhwa.get("chapters", []):
             pages.append(len(chapter.get("pages", [])))
     avg_pages = int(sum(pages) / len(pages)) if pages else 0
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+CHUNK_SIZE = 1 << 20
+OBJECTS_DIR = "objects"
+SOURCES_DIR = "sources"
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(source: Path, *params) -> str:
+    digest = hashlib.sha256(file_digest(source).encode("ascii"))
+    digest.update(repr(params).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def fetch(store_dir: Path, key: str, output_path: Path) -> bool:
+    cached = _entry_path(store_dir, SOURCES_DIR, key, output_path.suffix)
+    if not cached.exists():
+        return False
+    return _link(cached, output_path)
+
+
+def intern(store_dir: Path, output_path: Path, key: Optional[str] = None) -> None:
+    target = _entry_path(store_dir, OBJECTS_DIR, file_digest(output_path), output_path.suffix)
+    if target.exists():
+        if not _link(target, output_path):
+            return
+    elif not _link(output_path, target):
+        return
+    if key:
+        _link(target, _entry_path(store_dir, SOURCES_DIR, key, output_path.suffix))
+
+
+def prune(store_dir: Path) -> int:
+    inodes: Dict[Tuple[int, int], List[Path]] = {}
+    for path in Path(store_dir).glob("*/*/*"):
+        if not path.is_file() or path.name.startswith("."):
+            continue
+        stat = path.stat()
+        inodes.setdefault((stat.st_dev, stat.st_ino), []).append(path)
+    removed = 0
+    for paths in inodes.values():
+        if len(paths) < paths[0].stat().st_nlink:
+            continue
+        for path in paths:
+            path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def _entry_path(store_dir: Path, kind: str, digest: str, suffix: str) -> Path:
+    return Path(store_dir) / kind / digest[:2] / f"{digest}{suffix}"
+
+
+def _link(source: Path, target: Path) -> bool:
+    try:
+        if target.exists() and os.path.samefile(source, target):
+            return True
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        temp_path.unlink(missing_ok=True)
+        os.link(source, temp_path)
+        temp_path.replace(target)
+    except OSError:
+        return False
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed page store.")
+    subparsers = parser.add_subparsers(dest="command")
+    prune_parser = subparsers.add_parser("prune", help="Drop stored pages no chapter links to anymore.")
+    prune_parser.add_argument("store_dir", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "prune":
+        print(f"Removed {prune(args.store_dir)} unreferenced pages.")
+        return
+    parser.print_help()
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import tempfile
 from pathlib import Path
 from typing import List
 
@@ -10,21 +11,23 @@ from pdf2image.exceptions import PDFInfoNotInstalledError, PDFPageCountError
 def pdf_to_images(pdf_path: str | Path, output_folder: str | Path) -> List[Path]:
     output_folder = Path(output_folder)
     output_folder.mkdir(parents=True, exist_ok=True)
-    try:
-        pages = convert_from_path(
-            str(pdf_path),
-            dpi=300,
-            fmt="jpeg",
-            jpegopt={"quality": 100, "optimize": False},
-        )
-    except PDFInfoNotInstalledError as exc:
-        raise RuntimeError("Poppler is not installed or not in PATH.") from exc
-    except PDFPageCountError as exc:
-        raise RuntimeError("Failed to read PDF page count.") from exc
-    output_files: List[Path] = []
-    for i, page in enumerate(pages):
-        output_path = output_folder / f"{i + 1:03}.jpg"
-        page.save(output_path, "JPEG", quality=100)
-        output_files.append(output_path)
+    with tempfile.TemporaryDirectory(prefix="pdf_render_", dir=output_folder) as render_dir:
+        try:
+            rendered = convert_from_path(
+                str(pdf_path),
+                dpi=300,
+                fmt="jpeg",
+                jpegopt={"quality": 100, "optimize": False},
+                output_folder=render_dir,
+                paths_only=True,
+            )
+        except PDFInfoNotInstalledError as exc:
+            raise RuntimeError("Poppler is not installed or not in PATH.") from exc
+        except PDFPageCountError as exc:
+            raise RuntimeError("Failed to read PDF page count.") from exc
+        output_files: List[Path] = []
+        for i, page_path in enumerate(rendered):
+            output_path = output_folder / f"{i + 1:03}.jpg"
+            Path(page_path).replace(output_path)
+            output_files.append(output_path)
     return output_files
-
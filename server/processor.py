@@ -2,18 +2,49 @@ from __future__ import annotations
 
 import json
 import logging
+import multiprocessing
+import os
 import posixpath
 import shutil
 import tempfile
+import threading
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from functools import partial
 from pathlib import Path, PurePosixPath
-from typing import Callable, Dict, List, Optional, Tuple
-
-from .ai_analyzer import analyze_images
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .ai_analyzer import AnalysisResult, analyze_images
+from .catalog import (
+    CHAPTER_MEDIA_FIELDS,
+    CatalogJournal,
+    CatalogLock,
+    CatalogMutation,
+    CatalogStore,
+    CatalogWriter,
+    get_store,
+    get_writer,
+    open_stores,
+)
+from .catalog_db import SqliteCatalog, open_catalog_db
+from .changes import ChangeLog, open_change_log
 from .file_detector import detect_file
 from .github import auto_deploy
-from .image_tools import apply_dmca_guard, generate_cover, optimize_image
+from .image_tools import (
+    MODE_WIDTHS,
+    TARGET_SSIM,
+    PageResult,
+    convert_page,
+    generate_cover,
+    page_extension,
+    page_size,
+    resolve_mode,
+    track_peak_rss,
+)
 from .pdf_to_img import pdf_to_images
+from .publish import publish_catalog_files, read_version, write_artifact
 
 
 QUALITY_LABELS = {
@@ -21,9 +52,63 @@ QUALITY_LABELS = {
     "Lossless": "lossless",
     "Webtoon Optimized": "webtoon",
     "Smart Compress": "smart",
+    "WebP": "webp",
+    "AVIF": "avif",
+    "Target SSIM": "target",
+    "Target SSIM (WebP)": "target_webp",
+    "Auto": "auto",
 }
 STATUS_VALUES = {"ongoing", "completed"}
 IMPORT_MARKER_KEY = "legacy_imported"
+CATALOG_SCHEMA_VERSION = 1
+CATALOG_FLUSH_INTERVAL = float(os.getenv("CATALOG_FLUSH_INTERVAL", "0.5"))
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "json").strip().lower()
+CATALOG_DB_PATH = os.getenv("CATALOG_DB_PATH", "")
+CATALOG_PRETTY_PATH = os.getenv("CATALOG_PRETTY_PATH", "")
+CATALOG_JOURNAL = os.getenv("CATALOG_JOURNAL", "1").strip().lower() not in {"0", "false", "no", "off"}
+CATALOG_COMPACT_ENTRIES = int(os.getenv("CATALOG_COMPACT_ENTRIES", "200"))
+CATALOG_COMPACT_INTERVAL = float(os.getenv("CATALOG_COMPACT_INTERVAL", "30"))
+PAGE_WORKERS = int(os.getenv("PAGE_WORKERS", "0")) or (os.cpu_count() or 1)
+PAGE_STORE = os.getenv("PAGE_STORE", "1").strip().lower() not in {"0", "false", "no", "off"}
+PAGE_STORE_DIR = os.getenv("PAGE_STORE_DIR", "")
+PASSTHROUGH_MAX_BYTES = 4 * 1024 * 1024
+PASSTHROUGH_MAX_WIDTH = 2000
+PAGE_MAX_IN_FLIGHT = max(int(os.getenv("PAGE_MAX_IN_FLIGHT", "0")) or PAGE_WORKERS, 1)
+AUTO_STRIP_RATIO = 1.6
+TRIM_PADDING = 16
+PAGE_PIXEL_BUDGET = int(os.getenv("PAGE_PIXEL_BUDGET", str(150_000_000)))
+
+_UNPUBLISHED: Dict[str, Optional[set[str]]] = {}
+_UNPUBLISHED_LOCK = threading.Lock()
+_PAGE_POOL: Optional[ProcessPoolExecutor] = None
+_PAGE_POOL_LOCK = threading.Lock()
+
+
+class PixelBudget:
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._used = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, pixels: int, block: bool = True) -> bool:
+        with self._condition:
+            while not self._fits(pixels):
+                if not block:
+                    return False
+                self._condition.wait()
+            self._used += pixels
+            return True
+
+    def release(self, pixels: int) -> None:
+        with self._condition:
+            self._used = max(self._used - pixels, 0)
+            self._condition.notify_all()
+
+    def _fits(self, pixels: int) -> bool:
+        return self.limit <= 0 or not self._used or self._used + pixels <= self.limit
+
+
+_PIXEL_BUDGET = PixelBudget(PAGE_PIXEL_BUDGET)
 
 
 def load_settings(settings_path: Path) -> Dict:
@@ -33,6 +118,17 @@ def load_settings(settings_path: Path) -> Dict:
             "auto_deploy": False,
             "dmca_watermark_text": "",
             "dmca_watermark_opacity": 0.0,
+            "jpeg_fallback": False,
+            "responsive_widths": [],
+            "passthrough_max_bytes": PASSTHROUGH_MAX_BYTES,
+            "passthrough_max_width": PASSTHROUGH_MAX_WIDTH,
+            "strip_metadata": False,
+            "tile_height": 0,
+            "target_ssim": TARGET_SSIM,
+            "greyscale_detection": True,
+            "trim_borders": False,
+            "trim_padding": TRIM_PADDING,
+            "downscale_oversized": False,
         }
         save_settings(settings_path, default)
         return default
@@ -64,6 +160,94 @@ def _read_manhwa_list(manhwa_path: Path, log_errors: bool = True) -> List[Dict]:
 
 
 def load_manhwa(manhwa_path: Path) -> List[Dict]:
+    return _catalog_store(manhwa_path).snapshot()
+
+
+def _catalog_store(manhwa_path: Path) -> CatalogStore:
+    return _catalog_writer(manhwa_path).store
+
+
+def _catalog_writer(manhwa_path: Path) -> CatalogWriter:
+    data_dir = manhwa_path.parents[1] / "data"
+    lock = CatalogLock(data_dir / f"{manhwa_path.stem}.lock")
+    if CATALOG_BACKEND == "sqlite":
+        store = get_store(manhwa_path, _load_catalog_db, stamp=_catalog_db(manhwa_path).stamp)
+        return get_writer(store, _persist_catalog, CATALOG_FLUSH_INTERVAL, lock=lock)
+    store = get_store(manhwa_path, _load_manhwa_file)
+    if not CATALOG_JOURNAL:
+        return get_writer(store, _persist_catalog, CATALOG_FLUSH_INTERVAL, lock=lock)
+    journal = CatalogJournal(data_dir / f"{manhwa_path.stem}.journal")
+    return get_writer(store, _persist_catalog, CATALOG_COMPACT_INTERVAL, journal, CATALOG_COMPACT_ENTRIES, lock)
+
+
+def _catalog_db(manhwa_path: Path) -> SqliteCatalog:
+    db_path = Path(CATALOG_DB_PATH) if CATALOG_DB_PATH else manhwa_path.parents[1] / "data" / "catalog.sqlite3"
+    return open_catalog_db(db_path)
+
+
+def _load_catalog_db(manhwa_path: Path) -> List[Dict]:
+    database = _catalog_db(manhwa_path)
+    if database.is_empty() and manhwa_path.exists():
+        data = _load_manhwa_file(manhwa_path)
+        database.persist(data, [CatalogMutation("replace")])
+        logging.info("Imported %s manhwa from %s into %s", len(data), manhwa_path, database.db_path)
+        return data
+    return database.load()
+
+
+def _change_log(manhwa_path: Path) -> ChangeLog:
+    return open_change_log(manhwa_path.parents[1] / "data" / "catalog_changes.jsonl")
+
+
+def _persist_catalog(manhwa_path: Path, data: List[Dict], mutations: List[CatalogMutation]) -> None:
+    if CATALOG_BACKEND == "sqlite":
+        _catalog_db(manhwa_path).persist(data, mutations)
+        _record_changes(manhwa_path, mutations)
+        _mark_unpublished(manhwa_path, _changed_ids(mutations))
+        return
+    _write_manhwa_file(manhwa_path, data, sync=False)
+    _record_changes(manhwa_path, mutations)
+    _sync_public_manhwa(manhwa_path, data, _changed_ids(mutations))
+
+
+def _record_changes(manhwa_path: Path, mutations: List[CatalogMutation]) -> None:
+    try:
+        _change_log(manhwa_path).record(mutations)
+    except Exception:  # noqa: BLE001
+        logging.exception("Failed to record catalog changes for %s", manhwa_path.resolve())
+
+
+def _changed_ids(mutations: List[CatalogMutation]) -> Optional[set[str]]:
+    if any(mutation.kind == "replace" for mutation in mutations):
+        return None
+    return {mutation.manhwa_id for mutation in mutations}
+
+
+def _mark_unpublished(manhwa_path: Path, changed_ids: Optional[set[str]]) -> None:
+    key = os.path.abspath(manhwa_path)
+    with _UNPUBLISHED_LOCK:
+        if key not in _UNPUBLISHED:
+            return
+        pending = _UNPUBLISHED[key]
+        _UNPUBLISHED[key] = None if pending is None or changed_ids is None else pending | changed_ids
+
+
+def _take_unpublished(manhwa_path: Path) -> Optional[set[str]]:
+    key = os.path.abspath(manhwa_path)
+    with _UNPUBLISHED_LOCK:
+        changed_ids = _UNPUBLISHED.get(key)
+        _UNPUBLISHED[key] = set()
+        return changed_ids
+
+
+def commit_catalog(manhwa_path: Path, mutation: CatalogMutation, auto_deploy_enabled: bool = True) -> Any:
+    result = _catalog_writer(manhwa_path).submit(mutation).result()
+    if auto_deploy_enabled:
+        trigger_deploy()
+    return result
+
+
+def _load_manhwa_file(manhwa_path: Path) -> List[Dict]:
     if not manhwa_path.exists():
         manhwa_path.parent.mkdir(parents=True, exist_ok=True)
         with manhwa_path.open("w", encoding="utf-8") as file:
@@ -74,34 +258,82 @@ def load_manhwa(manhwa_path: Path) -> List[Dict]:
     if not data:
         logging.error("manhwa.json is empty at %s", manhwa_path.resolve())
         return []
+    if _is_current_schema(data):
+        return data
     base_dir = manhwa_path.parents[1]
     public_dir = manhwa_path.parent
     normalized = _ensure_schema(data, base_dir=base_dir, public_dir=public_dir)
     if normalized is not data:
-        save_manhwa(manhwa_path, normalized)
+        _write_manhwa_file(manhwa_path, normalized)
         return normalized
     return data
 
 
+def _is_current_schema(data: List[Dict]) -> bool:
+    return all(isinstance(entry, dict) and entry.get("schema") == CATALOG_SCHEMA_VERSION for entry in data)
+
+
 def save_manhwa(manhwa_path: Path, data: List[Dict], auto_deploy_enabled: bool = True) -> None:
-    manhwa_path.parent.mkdir(parents=True, exist_ok=True)
-    temp_path = manhwa_path.with_suffix(".tmp")
-    with temp_path.open("w", encoding="utf-8") as file:
-        json.dump(data, file, ensure_ascii=False, indent=2)
-    temp_path.replace(manhwa_path)
-    _sync_public_manhwa(manhwa_path, data)
+    if not _is_current_schema(data):
+        data = _ensure_schema(data, base_dir=manhwa_path.parents[1], public_dir=manhwa_path.parent)
+    commit_catalog(manhwa_path, CatalogMutation("replace", payload={"entries": data}), auto_deploy_enabled=False)
+    flush_catalog(manhwa_path)
     if auto_deploy_enabled:
         trigger_deploy()
 
 
+def flush_catalog(manhwa_path: Path) -> None:
+    _catalog_writer(manhwa_path).flush()
+
+
+def publish_catalog(manhwa_path: Path) -> None:
+    flush_catalog(manhwa_path)
+    if CATALOG_BACKEND != "sqlite":
+        return
+    changed_ids = _take_unpublished(manhwa_path)
+    if changed_ids is not None and not changed_ids:
+        return
+    try:
+        _write_manhwa_file(manhwa_path, _catalog_store(manhwa_path).entries(), changed_ids=changed_ids)
+    except Exception:
+        _mark_unpublished(manhwa_path, changed_ids)
+        raise
+
+
+def _write_manhwa_file(
+    manhwa_path: Path,
+    data: List[Dict],
+    sync: bool = True,
+    changed_ids: Optional[set[str]] = None,
+) -> None:
+    write_artifact(manhwa_path, _compact_json(data))
+    if CATALOG_PRETTY_PATH:
+        pretty_path = Path(CATALOG_PRETTY_PATH)
+        pretty_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = pretty_path.with_suffix(".tmp")
+        with temp_path.open("w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+        temp_path.replace(pretty_path)
+    if sync:
+        _sync_public_manhwa(manhwa_path, data, changed_ids)
+
+
 def trigger_deploy() -> tuple[str, str]:
+    versions = []
+    for store in open_stores():
+        publish_catalog(store.path)
+        versions.append((store.path, read_version(store.path.parents[1] / "public")))
     git_result, netlify_result = auto_deploy("Manhwa update")
+    if not git_result.startswith("Git push failed"):
+        for manhwa_path, version in versions:
+            if version:
+                _record_deployed(manhwa_path, version)
     logging.info("Auto deploy result: %s | %s", git_result, netlify_result)
     return git_result, netlify_result
 
 
 def get_manhwa_list(manhwa_path: Path) -> List[Dict]:
-    manhwas = load_manhwa(manhwa_path)
+    manhwas = _catalog_store(manhwa_path).entries()
     try:
         resolved = manhwa_path.resolve()
     except OSError:
@@ -112,18 +344,36 @@ def get_manhwa_list(manhwa_path: Path) -> List[Dict]:
 
 
 def get_manhwa_by_id(manhwa_path: Path, manhwa_id: str) -> Optional[Dict]:
-    manhwas = load_manhwa(manhwa_path)
-    for item in manhwas:
-        if item["id"] == manhwa_id:
-            return item
-    return None
+    return _catalog_store(manhwa_path).get(manhwa_id)
+
+
+def get_chapter(manhwa_path: Path, manhwa_id: str, chapter_number: str) -> Optional[Dict]:
+    return _catalog_store(manhwa_path).get_chapter(manhwa_id, chapter_number)
 
 
 def get_chapter_numbers(manhwa_path: Path, manhwa_id: str) -> List[str]:
-    manhwa = get_manhwa_by_id(manhwa_path, manhwa_id)
-    if not manhwa:
-        return []
-    return [str(ch["number"]) for ch in manhwa.get("chapters", [])]
+    return _catalog_store(manhwa_path).chapter_numbers(manhwa_id)
+
+
+def get_revision(manhwa_path: Path) -> int:
+    return _change_log(manhwa_path).revision
+
+
+def get_changes(manhwa_path: Path, since: int) -> Dict:
+    change_log = _change_log(manhwa_path)
+    changes = change_log.since(since)
+    if changes is None or any(change["type"] == "catalog_replaced" for change in changes):
+        return {"from": since, "to": change_log.revision, "reset": True, "changes": [], "manhwa": {}}
+    revision = changes[-1]["rev"] if changes else since
+    store = _catalog_store(manhwa_path)
+    touched = {change["manhwaId"] for change in changes if change.get("manhwaId")}
+    return {
+        "from": since,
+        "to": revision,
+        "reset": False,
+        "changes": changes,
+        "manhwa": {manhwa_id: store.get(manhwa_id) for manhwa_id in touched},
+    }
 
 
 def add_manhwa(
@@ -135,9 +385,8 @@ def add_manhwa(
     public_dir: Path,
     settings: Dict,
 ) -> Dict:
-    manhwas = load_manhwa(manhwa_path)
     manhwa_id = _slugify(title)
-    if any(item["id"] == manhwa_id for item in manhwas):
+    if get_manhwa_by_id(manhwa_path, manhwa_id):
         raise ValueError("Manhwa already exists.")
 
     cover_rel = f"/covers/{manhwa_id}.jpg"
@@ -149,29 +398,32 @@ def add_manhwa(
         "id": manhwa_id,
         "title": title,
         "slug": manhwa_id,
-        "genres": genres,
+        "genres": _normalize_genres(genres),
         "description": "",
         "status": _normalize_status(status),
         "cover": cover_rel,
         "chapters": [],
         "updatedAt": now,
+        "schema": CATALOG_SCHEMA_VERSION,
     }
-    manhwas.append(entry)
-    save_manhwa(manhwa_path, manhwas)
-    return entry
+    return commit_catalog(manhwa_path, CatalogMutation("add_manhwa", manhwa_id, {"entry": entry}))
+
+
+def update_manhwa(manhwa_path: Path, manhwa_id: str, fields: Dict, auto_deploy_enabled: bool = True) -> Dict:
+    now = datetime.utcnow().isoformat(timespec="seconds")
+    fields = dict(fields)
+    if "title" in fields:
+        fields["title"] = str(fields["title"] or "Untitled").strip()
+    if "genres" in fields:
+        fields["genres"] = _normalize_genres(fields["genres"])
+    if "status" in fields:
+        fields["status"] = _normalize_status(fields["status"])
+    mutation = CatalogMutation("update_manhwa", manhwa_id, {"fields": fields, "now": now})
+    return commit_catalog(manhwa_path, mutation, auto_deploy_enabled=auto_deploy_enabled)
 
 
 def delete_manhwa(manhwa_path: Path, public_dir: Path, manhwa_id: str) -> Dict:
-    manhwas = load_manhwa(manhwa_path)
-    target = None
-    remaining = []
-    for item in manhwas:
-        if item["id"] == manhwa_id:
-            target = item
-        else:
-            remaining.append(item)
-    if not target:
-        raise ValueError("Manhwa not found.")
+    target = commit_catalog(manhwa_path, CatalogMutation("delete_manhwa", manhwa_id), auto_deploy_enabled=False)
     cover_rel = target.get("cover")
     if cover_rel:
         cover_path = public_dir / cover_rel.lstrip("/")
@@ -180,12 +432,12 @@ def delete_manhwa(manhwa_path: Path, public_dir: Path, manhwa_id: str) -> Dict:
     chapter_dir = public_dir / "manhwa" / manhwa_id
     if chapter_dir.exists():
         shutil.rmtree(chapter_dir, ignore_errors=True)
-    save_manhwa(manhwa_path, remaining)
+    trigger_deploy()
     return target
 
 
 def clear_all_manhwa(manhwa_path: Path, public_dir: Path) -> int:
-    manhwas = load_manhwa(manhwa_path)
+    manhwas = _catalog_store(manhwa_path).entries()
     for item in manhwas:
         cover_rel = item.get("cover")
         if cover_rel:
@@ -209,65 +461,53 @@ def add_chapter(
     pages: List[str],
     overwrite: bool = False,
     auto_deploy_enabled: bool = True,
+    meta: Optional[Dict] = None,
 ) -> None:
-    manhwas = load_manhwa(manhwa_path)
     now = datetime.utcnow().isoformat(timespec="seconds")
-    for item in manhwas:
-        if item["id"] == manhwa_id:
-            if "chapters" not in item or not isinstance(item["chapters"], list):
-                item["chapters"] = []
-            for chapter in item["chapters"]:
-                if str(chapter.get("number")) == str(chapter_number):
-                    if not overwrite:
-                        raise ValueError("Chapter already exists.")
-                    chapter_id = chapter.get("id") or f"{manhwa_id}-chapter-{chapter_number}"
-                    chapter_title = chapter.get("title") or f"Chapter {chapter_number}"
-                    created_at = _normalize_updated_at(chapter.get("createdAt"), now)
-                    chapter.update(
-                        {
-                            "id": chapter_id,
-                            "number": str(chapter_number),
-                            "title": chapter_title,
-                            "pages": pages,
-                            "createdAt": created_at,
-                        }
-                    )
-                    item["updatedAt"] = now
-                    save_manhwa(manhwa_path, manhwas, auto_deploy_enabled=auto_deploy_enabled)
-                    return
-            item["chapters"].append(
-                {
-                    "id": f"{manhwa_id}-chapter-{chapter_number}",
-                    "number": str(chapter_number),
-                    "title": f"Chapter {chapter_number}",
-                    "pages": pages,
-                    "createdAt": now,
-                }
-            )
-            item["updatedAt"] = now
-            save_manhwa(manhwa_path, manhwas, auto_deploy_enabled=auto_deploy_enabled)
-            return
-    raise ValueError("Manhwa not found.")
+    mutation = CatalogMutation(
+        "add_chapter",
+        manhwa_id,
+        {"number": str(chapter_number), "pages": pages, "meta": meta or {}, "overwrite": overwrite, "now": now},
+    )
+    commit_catalog(manhwa_path, mutation, auto_deploy_enabled=auto_deploy_enabled)
+
+
+def add_chapters(
+    manhwa_path: Path,
+    manhwa_id: str,
+    chapters: List[Tuple],
+    overwrite: bool = False,
+    auto_deploy_enabled: bool = True,
+    skip_existing: bool = False,
+) -> List[Dict]:
+    if not chapters:
+        return []
+    now = datetime.utcnow().isoformat(timespec="seconds")
+    mutation = CatalogMutation(
+        "add_chapters",
+        manhwa_id,
+        {
+            "chapters": [_chapter_item(*chapter) for chapter in chapters],
+            "overwrite": overwrite,
+            "skip_existing": skip_existing,
+            "now": now,
+        },
+    )
+    return commit_catalog(manhwa_path, mutation, auto_deploy_enabled=auto_deploy_enabled)
+
+
+def _chapter_item(number, pages: List[str], meta: Optional[Dict] = None) -> Dict:
+    return {"number": str(number), "pages": list(pages), "meta": meta or {}}
 
 
 def delete_chapter(manhwa_path: Path, public_dir: Path, manhwa_id: str, chapter_number: str) -> None:
-    manhwas = load_manhwa(manhwa_path)
     now = datetime.utcnow().isoformat(timespec="seconds")
-    for item in manhwas:
-        if item["id"] != manhwa_id:
-            continue
-        chapters = item.get("chapters", [])
-        remaining = [ch for ch in chapters if str(ch.get("number")) != str(chapter_number)]
-        if len(remaining) == len(chapters):
-            raise ValueError("Chapter not found.")
-        item["chapters"] = remaining
-        item["updatedAt"] = now
-        chapter_dir = public_dir / "manhwa" / manhwa_id / f"chapter-{chapter_number}"
-        if chapter_dir.exists():
-            shutil.rmtree(chapter_dir, ignore_errors=True)
-        save_manhwa(manhwa_path, manhwas)
-        return
-    raise ValueError("Manhwa not found.")
+    mutation = CatalogMutation("delete_chapter", manhwa_id, {"number": str(chapter_number), "now": now})
+    commit_catalog(manhwa_path, mutation, auto_deploy_enabled=False)
+    chapter_dir = public_dir / "manhwa" / manhwa_id / f"chapter-{chapter_number}"
+    if chapter_dir.exists():
+        shutil.rmtree(chapter_dir, ignore_errors=True)
+    trigger_deploy()
 
 
 def analyze_upload(upload_path: Path) -> Dict:
@@ -320,6 +560,7 @@ def process_upload(
     auto_deploy_enabled: bool = True,
     page_prefix: str = "",
     page_padding: int = 3,
+    defer_commit: bool = False,
 ) -> Dict:
     if not upload_path:
         raise ValueError("Upload file not found.")
@@ -341,16 +582,30 @@ def process_upload(
         if not cleaned:
             raise ValueError("No valid pages found after cleanup.")
 
-        pages = _process_images(
+        result = convert_chapter(
             cleaned,
             chapter_dir,
-            mode=quality_override or settings.get("quality_mode", "lossless"),
-            dmca_text=settings.get("dmca_watermark_text", ""),
-            dmca_opacity=settings.get("dmca_watermark_opacity", 0.0),
+            settings,
+            quality_override or settings.get("quality_mode", "lossless"),
+            analysis,
+            store_dir=_page_store_dir(manhwa_path),
             progress_callback=progress_callback,
             page_prefix=page_prefix,
             page_padding=page_padding,
         )
+        result["analysis"] = analysis
+        pages = result["pages"]
+        meta = result["meta"]
+        logging.info(
+            "Converted %s chapter %s: %s pages, %s pixels trimmed, peak RSS %.1f MiB",
+            manhwa_id,
+            chapter_number,
+            len(pages),
+            result["trimmed_pixels"],
+            result["peak_rss_mb"],
+        )
+        if defer_commit:
+            return result
         _notify_progress(progress_callback, "Updating manhwa.json")
         add_chapter(
             manhwa_path,
@@ -359,12 +614,86 @@ def process_upload(
             pages,
             overwrite=overwrite,
             auto_deploy_enabled=auto_deploy_enabled,
+            meta=meta,
         )
-        return {"pages_count": len(pages), "pages": pages, "analysis": analysis}
+        return result
     finally:
         shutil.rmtree(temp_dir, ignore_errors=True)
 
 
+def convert_chapter(
+    images: List[Path],
+    chapter_dir: Path,
+    settings: Dict,
+    mode: str,
+    analysis: AnalysisResult,
+    store_dir: Optional[Path] = None,
+    progress_callback: Optional[Callable[[str, Optional[int], Optional[int]], None]] = None,
+    page_prefix: str = "",
+    page_padding: int = 3,
+    continued_pages: Sequence[Path] = (),
+    page_stems: Sequence[str] = (),
+) -> Dict:
+    widths = sorted({int(width) for width in settings.get("responsive_widths") or () if int(width) > 0})
+    jpeg_fallback = bool(settings.get("jpeg_fallback", False))
+    greyscale_pages = analysis.greyscale_pages if settings.get("greyscale_detection", True) else ()
+    page_modes = _auto_page_modes(images, analysis, jpeg_fallback, greyscale_pages) if mode == "auto" else None
+    converted = _process_images(
+        images,
+        chapter_dir,
+        mode=mode,
+        dmca_text=settings.get("dmca_watermark_text", ""),
+        dmca_opacity=settings.get("dmca_watermark_opacity", 0.0),
+        progress_callback=progress_callback,
+        page_prefix=page_prefix,
+        page_padding=page_padding,
+        jpeg_fallback=jpeg_fallback,
+        widths=widths,
+        max_bytes=int(settings.get("passthrough_max_bytes", PASSTHROUGH_MAX_BYTES)),
+        max_width=int(settings.get("passthrough_max_width", PASSTHROUGH_MAX_WIDTH)),
+        strip_metadata=bool(settings.get("strip_metadata", False)),
+        store_dir=store_dir,
+        tile_height=int(settings.get("tile_height", 0) or 0),
+        target_ssim=float(settings.get("target_ssim", TARGET_SSIM)),
+        page_modes=page_modes,
+        greyscale_pages=greyscale_pages,
+        trim_padding=int(settings.get("trim_padding", TRIM_PADDING)) if settings.get("trim_borders") else None,
+        page_stems=page_stems,
+        max_pixels=max(PAGE_PIXEL_BUDGET, 0) if settings.get("downscale_oversized") else 0,
+    )
+    pages = [name for page in converted for name in page.tiles or (page.name,)]
+    meta = _responsive_meta(widths, {name: page.width for page in converted for name in page.tiles or (page.name,)})
+    continued_sources = set(continued_pages)
+    continued = []
+    for image, page in zip(images, converted):
+        continued.extend(page.tiles[:-1])
+        if image in continued_sources:
+            continued.append(page.tiles[-1] if page.tiles else page.name)
+    if continued:
+        meta["continued"] = continued
+    if page_modes:
+        meta["encoding"] = _auto_encoding(analysis, page_modes)
+    downscaled = [name for page in converted if page.downscaled for name in page.tiles or (page.name,)]
+    if downscaled:
+        meta["downscaled"] = downscaled
+    passthrough_count = sum(1 for page in converted if page.passthrough)
+    reused_count = sum(1 for page in converted if page.reused)
+    return {
+        "pages_count": len(pages),
+        "pages": pages,
+        "meta": meta,
+        "passthrough_count": passthrough_count,
+        "reused_count": reused_count,
+        "transcoded_count": len(converted) - passthrough_count - reused_count,
+        "tile_count": sum(len(page.tiles) for page in converted),
+        "saved_bytes": sum(page.saved_bytes for page in converted),
+        "greyscale_count": sum(1 for page in converted if page.greyscale),
+        "trimmed_pixels": sum(page.trimmed_pixels for page in converted),
+        "downscaled_count": sum(1 for page in converted if page.downscaled),
+        "peak_rss_mb": max((page.peak_rss_mb for page in converted), default=0.0),
+    }
+
+
 def log_action(user_id: int, action: str, logs_path: Path) -> None:
     logs_path.parent.mkdir(parents=True, exist_ok=True)
     if logs_path.exists():
@@ -409,24 +738,188 @@ def _process_images(
     progress_callback: Optional[Callable[[str, Optional[int], Optional[int]], None]] = None,
     page_prefix: str = "",
     page_padding: int = 3,
-) -> List[str]:
+    jpeg_fallback: bool = False,
+    widths: Sequence[int] = (),
+    max_bytes: int = 0,
+    max_width: int = 0,
+    strip_metadata: bool = False,
+    store_dir: Optional[Path] = None,
+    tile_height: int = 0,
+    target_ssim: float = TARGET_SSIM,
+    page_modes: Optional[Sequence[str]] = None,
+    greyscale_pages: Sequence[Path] = (),
+    trim_padding: Optional[int] = None,
+    page_stems: Sequence[str] = (),
+    max_pixels: int = 0,
+) -> List[PageResult]:
     if not image_paths:
         raise ValueError("No images found in upload.")
-    pages: List[str] = []
-    total = len(image_paths)
-    for index, image_path in enumerate(image_paths, start=1):
-        if progress_callback and (index == 1 or index == total or index % 5 == 0):
-            _notify_progress(progress_callback, "converting", index, total)
-        output_name = f"{page_prefix}{index:0{page_padding}d}.jpg"
-        output_path = chapter_dir / output_name
-        if mode == "original" and image_path.suffix.lower() in {".jpg", ".jpeg"}:
-            shutil.copy(image_path, output_path)
+    page_modes = list(page_modes or [mode] * len(image_paths))
+    greyscale = set(greyscale_pages)
+    convert = partial(
+        convert_page,
+        mode=mode,
+        dmca_text=dmca_text,
+        dmca_opacity=dmca_opacity,
+        jpeg_fallback=jpeg_fallback,
+        widths=tuple(widths),
+        max_bytes=max_bytes,
+        max_width=max_width,
+        strip_metadata=strip_metadata,
+        store_dir=store_dir,
+        tile_height=tile_height,
+        target_ssim=target_ssim,
+        trim_padding=trim_padding,
+        max_pixels=max_pixels,
+    )
+    stems = list(page_stems) or [f"{page_prefix}{index:0{page_padding}d}" for index in range(1, len(image_paths) + 1)]
+    outputs = [
+        (image_path, chapter_dir / f"{stem}{page_extension(page_mode)}")
+        for image_path, page_mode, stem in zip(image_paths, page_modes, stems)
+    ]
+    total = len(outputs)
+    costs = [width * height for width, height in map(page_size, image_paths)]
+    if max_pixels:
+        costs = [min(cost, max_pixels) for cost in costs]
+    if PAGE_WORKERS <= 1 or total < 2:
+        results: List[PageResult] = []
+        for index, (image_path, output_path) in enumerate(outputs, start=1):
+            if progress_callback and (index == 1 or index == total or index % 5 == 0):
+                _notify_progress(progress_callback, "converting", index, total)
+            _PIXEL_BUDGET.acquire(costs[index - 1])
+            try:
+                results.append(
+                    convert(image_path, output_path, mode=page_modes[index - 1], greyscale=image_path in greyscale)
+                )
+            finally:
+                _PIXEL_BUDGET.release(costs[index - 1])
+        return results
+
+    pool = _page_pool()
+    pending = deque(enumerate(outputs))
+    in_flight: Dict[Future, int] = {}
+    ordered: List[Optional[PageResult]] = [None] * total
+    completed = 0
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < PAGE_MAX_IN_FLIGHT:
+                position, (image_path, output_path) = pending[0]
+                if not _PIXEL_BUDGET.acquire(costs[position], block=not in_flight):
+                    break
+                pending.popleft()
+                future = pool.submit(
+                    convert, image_path, output_path, mode=page_modes[position], greyscale=image_path in greyscale
+                )
+                future.add_done_callback(partial(_release_pixels, costs[position]))
+                in_flight[future] = position
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                ordered[in_flight.pop(future)] = future.result()
+                completed += 1
+                if progress_callback and (completed == 1 or completed == total or completed % 5 == 0):
+                    _notify_progress(progress_callback, "converting", completed, total)
+    except BrokenProcessPool:
+        _reset_page_pool(pool)
+        raise
+    finally:
+        for future in in_flight:
+            future.cancel()
+    return [result for result in ordered if result is not None]
+
+
+def _auto_page_modes(
+    image_paths: List[Path],
+    analysis: AnalysisResult,
+    jpeg_fallback: bool,
+    greyscale_pages: Sequence[Path],
+) -> List[str]:
+    standard = resolve_mode("target_webp" if jpeg_fallback else "target")
+    greyscale = set(greyscale_pages)
+    modes: List[str] = []
+    for path in image_paths:
+        width, height = analysis.page_sizes.get(path, (0, 0))
+        if width and height / width >= AUTO_STRIP_RATIO and width > MODE_WIDTHS["webtoon"]:
+            modes.append("webtoon")
+        elif path in greyscale:
+            modes.append(resolve_mode("target"))
         else:
-            shutil.copy(image_path, output_path)
-            optimize_image(output_path, mode)
-        apply_dmca_guard(output_path, dmca_text, dmca_opacity)
-        pages.append(output_path.name)
-    return pages
+            modes.append(standard)
+    return modes
+
+
+def _auto_encoding(analysis: AnalysisResult, page_modes: List[str]) -> Dict:
+    counts: Dict[str, int] = {}
+    for page_mode in page_modes:
+        counts[page_mode] = counts.get(page_mode, 0) + 1
+    return {
+        "mode": "auto",
+        "orientation": analysis.orientation,
+        "avgRatio": round(analysis.avg_ratio, 3),
+        "chapter": max(counts, key=counts.get),
+        "pages": counts,
+    }
+
+
+def _release_pixels(pixels: int, future: Future) -> None:
+    _PIXEL_BUDGET.release(pixels)
+
+
+def _page_store_dir(manhwa_path: Path) -> Optional[Path]:
+    if not PAGE_STORE:
+        return None
+    return Path(PAGE_STORE_DIR) if PAGE_STORE_DIR else manhwa_path.parents[1] / "data" / "pages"
+
+
+def chapter_media_meta(chapter_dir: Path, chapter: Dict, pages: List[str]) -> Dict:
+    meta = {"encoding": chapter["encoding"]} if "encoding" in chapter else {}
+    previous = list(chapter.get("pages") or [])
+    following = dict(zip(previous, previous[1:]))
+    was_continued = set(chapter.get("continued") or ())
+    continued = [
+        name for name, after in zip(pages, pages[1:]) if name in was_continued and following.get(name) == after
+    ]
+    if continued:
+        meta["continued"] = continued
+    was_downscaled = set(chapter.get("downscaled") or ())
+    downscaled = [name for name in pages if name in was_downscaled]
+    if downscaled:
+        meta["downscaled"] = downscaled
+    if "fullWidth" in chapter:
+        widths = sorted(int(path.name[1:]) for path in chapter_dir.glob("w*") if path.name[1:].isdigit())
+        full_widths = {name: page_size(chapter_dir / name)[0] for name in pages if (chapter_dir / name).is_file()}
+        meta.update(_responsive_meta(widths, full_widths))
+    return meta
+
+
+def _responsive_meta(widths: List[int], full_widths: Dict[str, int]) -> Dict:
+    if not widths or not full_widths:
+        return {}
+    full_width = Counter(full_widths.values()).most_common(1)[0][0]
+    meta = {"widths": [width for width in widths if width < max(full_widths.values())], "fullWidth": full_width}
+    page_widths = {name: width for name, width in full_widths.items() if width != full_width}
+    if page_widths:
+        meta["pageWidths"] = page_widths
+    return meta
+
+
+def _page_pool() -> ProcessPoolExecutor:
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is None:
+            _PAGE_POOL = ProcessPoolExecutor(
+                max_workers=PAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=track_peak_rss,
+            )
+        return _PAGE_POOL
+
+
+def _reset_page_pool(pool: ProcessPoolExecutor) -> None:
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is pool:
+            _PAGE_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
 
 
 def _slugify(text: str) -> str:
@@ -445,13 +938,43 @@ def _slugify(text: str) -> str:
     return slug or "manhwa"
 
 
-def _sync_public_manhwa(manhwa_path: Path, data: List[Dict]) -> None:
+def _sync_public_manhwa(manhwa_path: Path, data: List[Dict], changed_ids: Optional[set[str]] = None) -> None:
     if manhwa_path.name != "manhwa.json":
         return
-    public_path = manhwa_path.parents[1] / "public" / "manhwa.json"
-    public_path.parent.mkdir(parents=True, exist_ok=True)
-    with public_path.open("w", encoding="utf-8") as file:
-        json.dump(data, file, ensure_ascii=False, indent=2)
+    public_dir = manhwa_path.parents[1] / "public"
+    public_path = public_dir / "manhwa.json"
+    if public_path.resolve() != manhwa_path.resolve():
+        write_artifact(public_path, _compact_json(data))
+    try:
+        publish_catalog_files(public_dir, data, changed_ids, _change_log(manhwa_path), _deployed_version(manhwa_path))
+    except Exception:  # noqa: BLE001
+        logging.exception("Failed to publish catalog files to %s", public_dir.resolve())
+
+
+def _deployed_path(manhwa_path: Path) -> Path:
+    return manhwa_path.parents[1] / "data" / "deployed_version.json"
+
+
+def _record_deployed(manhwa_path: Path, version: Dict) -> None:
+    deployed_path = _deployed_path(manhwa_path)
+    deployed_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = deployed_path.with_suffix(".tmp")
+    with temp_path.open("w", encoding="utf-8") as file:
+        json.dump(version, file, ensure_ascii=False)
+    temp_path.replace(deployed_path)
+
+
+def _deployed_version(manhwa_path: Path) -> Dict:
+    try:
+        with _deployed_path(manhwa_path).open("r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _compact_json(data: List[Dict]) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 
 def _import_legacy_manhwa(legacy_path: Path, manhwa_path: Path) -> Optional[List[Dict]]:
@@ -524,6 +1047,7 @@ def _ensure_schema(data: List[Dict], base_dir: Path, public_dir: Path) -> List[D
             "chapters": _normalize_chapters(entry.get("chapters"), manhwa_id, now),
             "status": _normalize_status(entry.get("status")),
             "updatedAt": _normalize_updated_at(entry.get("updatedAt"), now),
+            "schema": CATALOG_SCHEMA_VERSION,
         }
         normalized.append(normalized_entry)
         if not isinstance(entry.get("updatedAt"), str):
@@ -618,15 +1142,15 @@ def _normalize_chapters(value, manhwa_id: str, now: str) -> List[Dict]:
         if not chapter_title:
             chapter_title = f"Chapter {number_str}"
         created_at = _normalize_updated_at(item.get("createdAt") or item.get("created_at"), now)
-        chapters.append(
-            {
-                "id": chapter_id,
-                "number": number_str,
-                "title": chapter_title,
-                "pages": pages,
-                "createdAt": created_at,
-            }
-        )
+        chapter = {
+            "id": chapter_id,
+            "number": number_str,
+            "title": chapter_title,
+            "pages": pages,
+            "createdAt": created_at,
+        }
+        chapter.update({key: item[key] for key in CHAPTER_MEDIA_FIELDS if key in item})
+        chapters.append(chapter)
     return chapters
 
 
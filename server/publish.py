@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .changes import ChangeLog
+
+
+LIBRARY_NAME = "library.json"
+VERSION_NAME = "version.json"
+CATALOG_DIR = "catalog"
+SNAPSHOT_DIR = "snapshots"
+CHANGES_DIR = "changes"
+CHANGES_WINDOW = 500
+PRECOMPRESS_MIN_BYTES = 1024
+COMPRESSED_SUFFIXES = (".gz", ".br")
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+SLIM_FIELDS = ("id", "title", "cover", "genres", "status", "updatedAt")
+
+
+def publish_catalog_files(
+    public_dir: Path,
+    entries: List[Dict],
+    changed_ids: Optional[Set[str]] = None,
+    change_log: Optional[ChangeLog] = None,
+    deployed: Optional[Dict] = None,
+) -> Dict:
+    deployed = deployed or {}
+    items = publish_library(public_dir, entries, changed_ids, deployed)
+    version_path = public_dir / VERSION_NAME
+    previous = _read_json(version_path)
+    pointer = {
+        "library": _publish_snapshot(
+            public_dir, "library", _dumps({"manhwa": items}), (previous.get("library"), deployed.get("library"))
+        ),
+        "manhwa": _publish_snapshot(
+            public_dir, "manhwa", _dumps(entries), (previous.get("manhwa"), deployed.get("manhwa"))
+        ),
+    }
+    if change_log is not None:
+        revision = change_log.revision
+        previous_revision = previous.get("revision")
+        if isinstance(previous_revision, int) and previous_revision < revision:
+            _publish_changes(public_dir, previous_revision, change_log.since(previous_revision), items)
+        _prune_changes(public_dir / CHANGES_DIR, revision - CHANGES_WINDOW)
+        pointer["revision"] = revision
+        pointer["changes"] = f"/{CHANGES_DIR}/"
+    _write_if_changed(version_path, _dumps(pointer))
+    return pointer
+
+
+def read_version(public_dir: Path) -> Dict:
+    return _read_json(public_dir / VERSION_NAME)
+
+
+def publish_library(
+    public_dir: Path,
+    entries: List[Dict],
+    changed_ids: Optional[Set[str]] = None,
+    deployed: Optional[Dict] = None,
+) -> List[Dict]:
+    catalog_dir = public_dir / CATALOG_DIR
+    library_path = public_dir / LIBRARY_NAME
+    previous = {item.get("id"): item for item in _read_library(library_path)}
+    deployed_url = (deployed or {}).get("library") or ""
+    live = {}
+    if deployed_url:
+        live = {item.get("id"): item for item in _read_library(public_dir / deployed_url.lstrip("/"))}
+    details = _list_details(catalog_dir)
+    items: List[Dict] = []
+    for entry in entries:
+        manhwa_id = entry.get("id")
+        if not manhwa_id:
+            continue
+        cached = previous.get(manhwa_id)
+        if cached is not None and changed_ids is not None and manhwa_id not in changed_ids:
+            items.append(cached)
+            continue
+        retained = (cached, live.get(manhwa_id))
+        items.append(
+            _publish_manhwa(public_dir, catalog_dir, entry, retained, details.get(_safe_name(manhwa_id), []))
+        )
+    kept_ids = {_safe_name(str(manhwa_id)) for manhwa_id in [*(item["id"] for item in items), *live]}
+    for safe_id in (set(details) | {_safe_name(str(manhwa_id)) for manhwa_id in previous}) - kept_ids:
+        _remove_manhwa(catalog_dir, safe_id, details.get(safe_id, []))
+    _write_if_changed(library_path, _dumps({"manhwa": items}))
+    return items
+
+
+def _publish_changes(public_dir: Path, from_revision: int, changes: Optional[List[Dict]], items: List[Dict]) -> None:
+    if not changes:
+        return
+    by_id = {item["id"]: item for item in items}
+    touched = {change["manhwaId"] for change in changes if change.get("manhwaId")}
+    delta = {
+        "from": from_revision,
+        "to": changes[-1]["rev"],
+        "reset": any(change["type"] == "catalog_replaced" for change in changes),
+        "changes": changes,
+        "manhwa": {manhwa_id: by_id.get(manhwa_id) for manhwa_id in sorted(touched)},
+    }
+    _write_if_changed(public_dir / CHANGES_DIR / f"{from_revision}.json", _dumps(delta))
+
+
+def _prune_changes(changes_dir: Path, oldest: int) -> None:
+    if not changes_dir.is_dir():
+        return
+    for path in changes_dir.iterdir():
+        stem = _base_name(path.name)[: -len(".json")]
+        if path.is_file() and stem.isdigit() and int(stem) < oldest:
+            path.unlink()
+
+
+def _publish_snapshot(public_dir: Path, stem: str, body: bytes, retained: Iterable[Optional[str]]) -> str:
+    snapshot_dir = public_dir / SNAPSHOT_DIR
+    name = f"{stem}.{_digest(body)}.json"
+    _write_once(snapshot_dir / name, body)
+    keep = {name}
+    keep.update(Path(url).name for url in retained if url)
+    _prune(snapshot_dir, f"{stem}.", keep)
+    return f"/{SNAPSHOT_DIR}/{name}"
+
+
+def _publish_manhwa(
+    public_dir: Path,
+    catalog_dir: Path,
+    entry: Dict,
+    retained: Iterable[Optional[Dict]],
+    details: List[Path],
+) -> Dict:
+    safe_id = _safe_name(entry["id"])
+    chapter_dir = catalog_dir / safe_id
+    keep: Set[str] = set()
+    chapters: List[Dict] = []
+    for chapter in entry.get("chapters") or []:
+        body = _dumps(chapter)
+        name = f"{_safe_name(str(chapter.get('number')))}.{_digest(body)}.json"
+        _write_once(chapter_dir / name, body)
+        keep.add(name)
+        ref = {key: value for key, value in chapter.items() if key != "pages"}
+        ref["pageCount"] = len(chapter.get("pages") or [])
+        ref["pagesUrl"] = f"/{CATALOG_DIR}/{safe_id}/{name}"
+        chapters.append(ref)
+    detail = {key: value for key, value in entry.items() if key != "chapters"}
+    detail["chapters"] = chapters
+    body = _dumps(detail)
+    detail_name = f"{safe_id}.{_digest(body)}.json"
+    _write_once(catalog_dir / detail_name, body)
+
+    keep_details = {detail_name}
+    for item in retained:
+        retained_url = (item or {}).get("detail") or ""
+        if retained_url:
+            retained_path = public_dir / retained_url.lstrip("/")
+            keep_details.add(retained_path.name)
+            keep.update(_referenced_chapter_files(retained_path))
+    _unlink_unkept(details, keep_details)
+    _prune(chapter_dir, "", keep)
+
+    item = {key: entry.get(key) for key in SLIM_FIELDS}
+    item["chapterCount"] = len(chapters)
+    item["latestChapter"] = _latest_chapter(chapters)
+    item["detail"] = f"/{CATALOG_DIR}/{detail_name}"
+    return item
+
+
+def _latest_chapter(chapters: List[Dict]) -> Optional[str]:
+    latest = None
+    latest_value = None
+    for chapter in chapters:
+        try:
+            value = float(chapter.get("number"))
+        except (TypeError, ValueError):
+            continue
+        if latest_value is None or value > latest_value:
+            latest_value = value
+            latest = str(chapter.get("number"))
+    if latest is None and chapters:
+        return str(chapters[-1].get("number"))
+    return latest
+
+
+def _referenced_chapter_files(detail_path: Path) -> Set[str]:
+    detail = _read_json(detail_path)
+    return {Path(str(ref.get("pagesUrl") or "")).name for ref in detail.get("chapters") or []}
+
+
+def _read_json(path: Path) -> Dict:
+    try:
+        with path.open("r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _read_library(library_path: Path) -> List[Dict]:
+    if not library_path.exists():
+        return []
+    try:
+        with library_path.open("r", encoding="utf-8") as file:
+            data = json.load(file)
+    except Exception:  # noqa: BLE001
+        logging.exception("Failed to read %s", library_path)
+        return []
+    items = data.get("manhwa") if isinstance(data, dict) else None
+    return [item for item in items or [] if isinstance(item, dict) and item.get("id")]
+
+
+def _remove_manhwa(catalog_dir: Path, safe_id: str, details: List[Path]) -> None:
+    _unlink_unkept(details, set())
+    _prune(catalog_dir / safe_id, "", set())
+    try:
+        (catalog_dir / safe_id).rmdir()
+    except OSError:
+        pass
+
+
+def _prune(directory: Path, prefix: str, keep: Set[str]) -> None:
+    if not directory.is_dir():
+        return
+    for path in directory.iterdir():
+        name = _base_name(path.name)
+        if not path.is_file() or not name.startswith(prefix) or name in keep:
+            continue
+        if prefix and name[len(prefix):].count(".") != 1:
+            continue
+        path.unlink()
+
+
+def _list_details(catalog_dir: Path) -> Dict[str, List[Path]]:
+    details: Dict[str, List[Path]] = {}
+    if not catalog_dir.is_dir():
+        return details
+    for path in catalog_dir.iterdir():
+        parts = _base_name(path.name).rsplit(".", 2)
+        if len(parts) == 3 and parts[2] == "json" and path.is_file():
+            details.setdefault(parts[0], []).append(path)
+    return details
+
+
+def _unlink_unkept(paths: List[Path], keep: Set[str]) -> None:
+    for path in paths:
+        if _base_name(path.name) not in keep:
+            path.unlink(missing_ok=True)
+
+
+def _base_name(name: str) -> str:
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def write_artifact(path: Path, body: bytes) -> None:
+    siblings = {}
+    if len(body) >= PRECOMPRESS_MIN_BYTES:
+        siblings[".gz"] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        siblings[".br"] = _brotli(body)
+    for suffix in COMPRESSED_SUFFIXES:
+        sibling_path = path.with_name(path.name + suffix)
+        if siblings.get(suffix) is None:
+            sibling_path.unlink(missing_ok=True)
+        else:
+            _atomic_write(sibling_path, siblings[suffix])
+    _atomic_write(path, body)
+
+
+def _brotli(body: bytes) -> Optional[bytes]:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def _write_once(path: Path, body: bytes) -> None:
+    if path.exists():
+        return
+    write_artifact(path, body)
+
+
+def _write_if_changed(path: Path, body: bytes) -> bool:
+    try:
+        if path.read_bytes() == body:
+            return False
+    except OSError:
+        pass
+    write_artifact(path, body)
+    return True
+
+
+def _atomic_write(path: Path, body: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_bytes(body)
+    temp_path.replace(path)
+
+
+def _dumps(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _digest(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()[:12]
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^0-9a-zA-Z._-]+", "_", value) or "_"
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bot.config import DATA_DIR, MANHWA_PATH, PUBLIC_DIR, SETTINGS_PATH
+from server import processor
+from server.ai_analyzer import analyze_images
+from server.catalog import CHAPTER_MEDIA_FIELDS
+
+
+REENCODE_STATE_PATH = DATA_DIR / "reencode_state.json"
+STAGING_SUFFIX = ".reencode"
+BACKUP_SUFFIX = ".previous"
+DEFAULT_SAMPLE_PAGES = 40
+SAMPLE_SEED = 0
+
+
+def run_reencode(
+    mode: str,
+    manhwa_ids: Optional[List[str]] = None,
+    limit: int = 0,
+    restart: bool = False,
+) -> Dict:
+    settings = _reencode_settings()
+    state = _load_state(mode, restart)
+    recovered = _recover(state)
+    done = set(state["done"])
+    summary = {"chapters": 0, "skipped": 0, "unchanged": 0, "bytes_before": 0, "bytes_after": 0}
+    for manhwa_id, chapter in _chapters(manhwa_ids):
+        key = _chapter_key(manhwa_id, chapter)
+        chapter_dir = _chapter_dir(manhwa_id, chapter)
+        if key in done:
+            continue
+        if limit and summary["chapters"] >= limit:
+            break
+        sources = [chapter_dir / name for name in chapter.get("pages") or []]
+        if not sources or not all(source.is_file() for source in sources):
+            logging.warning("Skipping %s: pages missing under %s", key, chapter_dir)
+            summary["skipped"] += 1
+            continue
+        before, after = _reencode_chapter(manhwa_id, chapter, chapter_dir, sources, settings, mode, state)
+        state.pop("swap", None)
+        state["done"].append(key)
+        done.add(key)
+        _save_state(state)
+        if after >= before:
+            summary["unchanged"] += 1
+            logging.info("Kept %s: re-encode would not shrink it (%s -> %s bytes)", key, before, after)
+            continue
+        summary["chapters"] += 1
+        summary["bytes_before"] += before
+        summary["bytes_after"] += after
+        logging.info("Re-encoded %s: %s -> %s bytes", key, before, after)
+    if summary["chapters"] or recovered:
+        if settings.get("auto_deploy"):
+            processor.trigger_deploy()
+        else:
+            processor.publish_catalog(MANHWA_PATH)
+    return summary
+
+
+def _reencode_settings() -> Dict:
+    settings = processor.load_settings(SETTINGS_PATH)
+    return {
+        **settings,
+        "dmca_watermark_text": "",
+        "dmca_watermark_opacity": 0.0,
+        "trim_borders": False,
+        "tile_height": 0,
+    }
+
+
+def estimate_savings(
+    mode: str,
+    manhwa_ids: Optional[List[str]] = None,
+    sample_pages: int = DEFAULT_SAMPLE_PAGES,
+) -> Dict:
+    settings = _reencode_settings()
+    pages = [
+        source
+        for manhwa_id, chapter in _chapters(manhwa_ids)
+        for source in (_chapter_dir(manhwa_id, chapter) / name for name in chapter.get("pages") or [])
+        if source.is_file()
+    ]
+    total_bytes = sum(page.stat().st_size for page in pages)
+    sample = random.Random(SAMPLE_SEED).sample(pages, min(sample_pages, len(pages)))
+    estimate = {"pages": len(pages), "bytes": total_bytes, "sampled": len(sample), "sample_before": 0, "sample_after": 0}
+    if not sample:
+        estimate["estimated_bytes"] = total_bytes
+        estimate["estimated_saved"] = 0
+        return estimate
+    temp_dir = Path(tempfile.mkdtemp(prefix="manhwa_reencode_"))
+    try:
+        result = processor.convert_chapter(sample, temp_dir, settings, mode, analyze_images(sample))
+        estimate["sample_before"] = sum(page.stat().st_size for page in sample)
+        estimate["sample_after"] = sum((temp_dir / name).stat().st_size for name in result["pages"])
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    ratio = estimate["sample_after"] / max(estimate["sample_before"], 1)
+    estimate["estimated_bytes"] = int(total_bytes * ratio)
+    estimate["estimated_saved"] = total_bytes - estimate["estimated_bytes"]
+    return estimate
+
+
+def _reencode_chapter(
+    manhwa_id: str,
+    chapter: Dict,
+    chapter_dir: Path,
+    sources: List[Path],
+    settings: Dict,
+    mode: str,
+    state: Dict,
+) -> Tuple[int, int]:
+    staging_dir = chapter_dir.with_name(chapter_dir.name + STAGING_SUFFIX)
+    backup_dir = chapter_dir.with_name(chapter_dir.name + BACKUP_SUFFIX)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+    continued = set(chapter.get("continued") or ())
+    try:
+        result = processor.convert_chapter(
+            sources,
+            staging_dir,
+            settings,
+            mode,
+            analyze_images(sources),
+            store_dir=processor._page_store_dir(MANHWA_PATH),
+            continued_pages=[source for source in sources if source.name in continued],
+            page_stems=[source.stem for source in sources],
+        )
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    before = sum(source.stat().st_size for source in sources)
+    after = sum((staging_dir / name).stat().st_size for name in result["pages"])
+    if after >= before:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return before, after
+    was_downscaled = {Path(name).stem for name in chapter.get("downscaled") or ()}
+    downscaled = set(result["meta"].get("downscaled") or ())
+    downscaled.update(name for name in result["pages"] if Path(name).stem in was_downscaled)
+    if downscaled:
+        result["meta"]["downscaled"] = [name for name in result["pages"] if name in downscaled]
+    state["swap"] = {
+        "manhwa": manhwa_id,
+        "number": str(chapter.get("number")),
+        "committed": False,
+    }
+    state["swap"]["pages"], state["swap"]["meta"] = _chapter_media(chapter)
+    _save_state(state)
+    chapter_dir.rename(backup_dir)
+    staging_dir.rename(chapter_dir)
+    processor.add_chapter(
+        MANHWA_PATH,
+        manhwa_id,
+        str(chapter.get("number")),
+        result["pages"],
+        overwrite=True,
+        auto_deploy_enabled=False,
+        meta=result["meta"],
+    )
+    processor.flush_catalog(MANHWA_PATH)
+    state["swap"]["committed"] = True
+    _save_state(state)
+    shutil.rmtree(backup_dir, ignore_errors=True)
+    return before, after
+
+
+def _recover(state: Dict) -> bool:
+    swap = state.pop("swap", None)
+    if not swap:
+        return False
+    manhwa_id, number = swap["manhwa"], swap["number"]
+    chapter_dir = _chapter_dir(manhwa_id, swap)
+    backup_dir = chapter_dir.with_name(chapter_dir.name + BACKUP_SUFFIX)
+    shutil.rmtree(chapter_dir.with_name(chapter_dir.name + STAGING_SUFFIX), ignore_errors=True)
+    changed = bool(swap.get("committed")) or backup_dir.is_dir()
+    if swap.get("committed"):
+        shutil.rmtree(backup_dir, ignore_errors=True)
+        key = _chapter_key(manhwa_id, swap)
+        if key not in state["done"]:
+            state["done"].append(key)
+    elif changed:
+        shutil.rmtree(chapter_dir, ignore_errors=True)
+        backup_dir.rename(chapter_dir)
+        chapter = processor.get_chapter(MANHWA_PATH, manhwa_id, number)
+        if chapter is not None and _chapter_media(chapter) != (swap["pages"], swap["meta"]):
+            processor.add_chapter(
+                MANHWA_PATH,
+                manhwa_id,
+                number,
+                swap["pages"],
+                overwrite=True,
+                auto_deploy_enabled=False,
+                meta=swap["meta"],
+            )
+            processor.flush_catalog(MANHWA_PATH)
+        logging.warning("Rolled back interrupted re-encode of %s/%s", manhwa_id, number)
+    _save_state(state)
+    return changed
+
+
+def _chapter_media(chapter: Dict) -> Tuple[List[str], Dict]:
+    meta = {field: chapter[field] for field in CHAPTER_MEDIA_FIELDS if field in chapter}
+    return list(chapter.get("pages") or []), meta
+
+
+def _chapters(manhwa_ids: Optional[List[str]]) -> Iterator[Tuple[str, Dict]]:
+    for entry in processor.get_manhwa_list(MANHWA_PATH):
+        manhwa_id = entry.get("id")
+        if not manhwa_id or (manhwa_ids and manhwa_id not in manhwa_ids):
+            continue
+        for chapter in entry.get("chapters") or []:
+            yield manhwa_id, chapter
+
+
+def _chapter_dir(manhwa_id: str, chapter: Dict) -> Path:
+    return PUBLIC_DIR / "manhwa" / manhwa_id / f"chapter-{chapter.get('number')}"
+
+
+def _chapter_key(manhwa_id: str, chapter: Dict) -> str:
+    return f"{manhwa_id}/{chapter.get('number')}"
+
+
+def _load_state(mode: str, restart: bool) -> Dict:
+    fresh = {"mode": mode, "done": []}
+    if not REENCODE_STATE_PATH.exists():
+        return fresh
+    with REENCODE_STATE_PATH.open("r", encoding="utf-8") as handle:
+        try:
+            data = json.load(handle)
+        except json.JSONDecodeError:
+            return fresh
+    if not isinstance(data, dict):
+        return fresh
+    if data.get("swap"):
+        fresh["swap"] = data["swap"]
+    if restart or data.get("mode") != mode:
+        return fresh
+    data.setdefault("done", [])
+    return data
+
+
+def _save_state(state: Dict) -> None:
+    REENCODE_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = REENCODE_STATE_PATH.with_name(f".{REENCODE_STATE_PATH.name}.tmp")
+    with temp_path.open("w", encoding="utf-8") as handle:
+        json.dump(state, handle, ensure_ascii=False, indent=2)
+    temp_path.replace(REENCODE_STATE_PATH)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-encode existing chapters with a new quality mode.")
+    parser.add_argument("mode", choices=sorted(set(processor.QUALITY_LABELS.values())))
+    parser.add_argument("--manhwa", action="append", help="Only re-encode this manhwa id (repeatable).")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many chapters.")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved checkpoint.")
+    parser.add_argument("--dry-run", action="store_true", help="Sample pages and estimate bytes saved.")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE_PAGES, help="Pages to sample in a dry run.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.dry_run:
+        estimate = estimate_savings(args.mode, args.manhwa, args.sample)
+        print(
+            f"{estimate['pages']} pages, {estimate['bytes']} bytes; sampled {estimate['sampled']} "
+            f"({estimate['sample_before']} -> {estimate['sample_after']} bytes)"
+        )
+        print(f"Estimated after re-encode: {estimate['estimated_bytes']} bytes, saving {estimate['estimated_saved']}")
+        return
+    summary = run_reencode(args.mode, args.manhwa, args.limit, args.restart)
+    print(
+        f"Re-encoded {summary['chapters']} chapters ({summary['skipped']} skipped, "
+        f"{summary['unchanged']} not smaller): "
+        f"{summary['bytes_before']} -> {summary['bytes_after']} bytes"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,29 @@
 from __future__ import annotations
 
 import json
+import mimetypes
 import os
-from datetime import datetime
+import stat
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 
-from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.staticfiles import NotModifiedResponse
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
 
 from .editor import update_chapter_pages
-from .processor import load_manhwa, normalize_status, save_manhwa
+from .processor import (
+    get_changes,
+    get_manhwa_by_id,
+    get_manhwa_list,
+    get_revision,
+    normalize_status,
+    update_manhwa,
+)
 from .telegram_auth import verify_init_data
 
 
@@ -21,6 +33,58 @@ WEBAPP_DIR = BASE_DIR / "webapp"
 MANHWA_PATH = PUBLIC_DIR / "manhwa.json"
 
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        request_headers = Headers(scope=scope)
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in accepted if scope["method"] in ("GET", "HEAD") else ():
+            full_path, stat_result = self.lookup_path(path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            response = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+        response = await super().get_response(path, scope)
+        response.headers.add_vary_header("Accept-Encoding")
+        return response
+
+
+def _accepted_encodings(header: str) -> List[Tuple[str, str]]:
+    weights = _encoding_weights(header)
+    accepted = [
+        (weights.get(encoding, weights.get("*", 0.0)), encoding, suffix)
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS
+    ]
+    accepted.sort(key=lambda item: -item[0])
+    return [(encoding, suffix) for weight, encoding, suffix in accepted if weight > 0]
+
+
+def _encoding_weights(header: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for item in header.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        if not name:
+            continue
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.lower()] = weight
+    return weights
+
 
 app = FastAPI(title="Manhwa Admin WebApp")
 app.add_middleware(
@@ -47,31 +111,40 @@ def _require_admin(init_data: str = Header(default="")) -> int:
 
 @app.get("/api/manhwa")
 def list_manhwa(user_id: int = Depends(_require_admin)) -> List[dict]:
-    return load_manhwa(MANHWA_PATH)
+    return get_manhwa_list(MANHWA_PATH)
+
+
+@app.get("/api/changes")
+def list_changes(
+    since: int = Query(default=0, ge=0),
+    head: bool = Query(default=False),
+    user_id: int = Depends(_require_admin),
+) -> dict:
+    if head:
+        return {"to": get_revision(MANHWA_PATH)}
+    return get_changes(MANHWA_PATH, since)
 
 
 @app.get("/api/manhwa/{manhwa_id}")
 def get_manhwa(manhwa_id: str, user_id: int = Depends(_require_admin)) -> dict:
-    manhwas = load_manhwa(MANHWA_PATH)
-    for item in manhwas:
-        if item["id"] == manhwa_id:
-            return item
+    manhwa = get_manhwa_by_id(MANHWA_PATH, manhwa_id)
+    if manhwa:
+        return manhwa
     raise HTTPException(status_code=404, detail="Manhwa not found.")
 
 
 @app.post("/api/manhwa/{manhwa_id}")
-def update_manhwa(manhwa_id: str, payload: dict, user_id: int = Depends(_require_admin)) -> dict:
-    manhwas = load_manhwa(MANHWA_PATH)
-    for item in manhwas:
-        if item["id"] != manhwa_id:
-            continue
-        item["title"] = payload.get("title", item["title"])
-        item["genres"] = payload.get("genres", item["genres"])
-        item["status"] = normalize_status(payload.get("status", item["status"]))
-        item["updatedAt"] = datetime.utcnow().isoformat(timespec="seconds")
-        save_manhwa(MANHWA_PATH, manhwas)
-        return item
-    raise HTTPException(status_code=404, detail="Manhwa not found.")
+def edit_manhwa(manhwa_id: str, payload: dict, user_id: int = Depends(_require_admin)) -> dict:
+    fields = {}
+    for key in ("title", "genres"):
+        if key in payload:
+            fields[key] = payload[key]
+    if "status" in payload:
+        fields["status"] = normalize_status(payload["status"])
+    try:
+        return update_manhwa(MANHWA_PATH, manhwa_id, fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail="Manhwa not found.") from exc
 
 
 @app.post("/api/manhwa/{manhwa_id}/chapters/{chapter_number}/pages")
@@ -93,3 +166,5 @@ def update_pages(
     )
     return {"pages": updated}
 
+
+app.mount("/", PrecompressedStaticFiles(directory=PUBLIC_DIR, html=True), name="public")
@@ -0,0 +1,123 @@
+import json
+
+from server.catalog import CatalogJournal, CatalogMutation, CatalogStore, CatalogWriter, apply_mutation
+from server.catalog_db import SqliteCatalog
+
+
+def _entry(manhwa_id, chapters=()):
+    return {
+        "id": manhwa_id,
+        "title": manhwa_id.title(),
+        "slug": manhwa_id,
+        "chapters": [{"id": f"{manhwa_id}-{n}", "number": n, "pages": ["001.jpg"]} for n in chapters],
+        "updatedAt": "",
+    }
+
+
+def _load_json(path):
+    return json.loads(path.read_text()) if path.exists() else []
+
+
+def _persist_json(path, entries, mutations):
+    path.write_text(json.dumps(entries))
+
+
+def _writer(tmp_path, persist=_persist_json):
+    catalog_path = tmp_path / "manhwa.json"
+    store = CatalogStore(catalog_path, _load_json)
+    journal = CatalogJournal(tmp_path / "manhwa.journal")
+    return CatalogWriter(store, persist, flush_interval=60, journal=journal), catalog_path
+
+
+def _add_chapter(manhwa_id, number):
+    return CatalogMutation("add_chapter", manhwa_id, {"number": number, "pages": ["001.jpg"], "now": "t"})
+
+
+def test_writer_journals_mutations_until_flush(tmp_path):
+    (tmp_path / "manhwa.json").write_text(json.dumps([_entry("solo")]))
+    writer, catalog_path = _writer(tmp_path)
+    writer.submit(_add_chapter("solo", "1")).result()
+
+    journal_lines = writer._journal.path.read_text().splitlines()
+    assert [json.loads(line)["kind"] for line in journal_lines] == ["add_chapter"]
+    assert _load_json(catalog_path)[0]["chapters"] == []
+
+    writer.flush()
+    assert [ch["number"] for ch in _load_json(catalog_path)[0]["chapters"]] == ["1"]
+    assert writer._journal.path.read_text() == ""
+
+
+def test_replay_adopts_orphaned_journal(tmp_path):
+    (tmp_path / "manhwa.json").write_text(json.dumps([_entry("solo")]))
+    orphan = tmp_path / "manhwa.99999.journal"
+    records = [{"kind": "add_chapter", "manhwaId": "solo", "payload": _add_chapter("solo", n).payload} for n in "12"]
+    orphan.write_text("".join(json.dumps(record) + "\n" for record in records) + "{torn")
+
+    writer, catalog_path = _writer(tmp_path)
+    assert writer.replay() == 2
+    assert not orphan.exists()
+    assert [ch["number"] for ch in _load_json(catalog_path)[0]["chapters"]] == ["1", "2"]
+
+
+def test_replay_skips_mutations_that_no_longer_apply(tmp_path):
+    (tmp_path / "manhwa.json").write_text(json.dumps([_entry("solo", ["1"])]))
+    orphan = tmp_path / "manhwa.99999.journal"
+    record = {"kind": "add_chapter", "manhwaId": "solo", "payload": _add_chapter("solo", "1").payload}
+    orphan.write_text(json.dumps(record) + "\n")
+
+    writer, catalog_path = _writer(tmp_path)
+    assert writer.replay() == 0
+    assert writer._journal.path.read_text() == ""
+
+
+def test_failed_persist_keeps_mutation_pending(tmp_path):
+    (tmp_path / "manhwa.json").write_text(json.dumps([_entry("solo")]))
+    calls = []
+
+    def flaky(path, entries, mutations):
+        calls.append([mutation.kind for mutation in mutations])
+        if len(calls) == 1:
+            raise OSError("disk full")
+        _persist_json(path, entries, mutations)
+
+    writer, catalog_path = _writer(tmp_path, flaky)
+    writer.submit(_add_chapter("solo", "1")).result()
+    try:
+        writer.flush()
+    except OSError:
+        pass
+    writer.flush()
+    assert calls == [["add_chapter"], ["add_chapter"]]
+    assert [ch["number"] for ch in _load_json(catalog_path)[0]["chapters"]] == ["1"]
+
+
+def _apply(entries, database, mutation):
+    mutation.payload.setdefault("now", "")
+    apply_mutation(entries, mutation)
+    database.persist(entries, [mutation])
+
+
+def test_sqlite_positions_follow_catalog_order(tmp_path):
+    database = SqliteCatalog(tmp_path / "catalog.sqlite3")
+    entries = [_entry("alpha", ["1", "2", "3"]), _entry("beta"), _entry("gamma")]
+    database.persist(entries, [CatalogMutation("replace")])
+
+    _apply(entries, database, CatalogMutation("delete_manhwa", "alpha"))
+    _apply(entries, database, CatalogMutation("add_manhwa", "delta", {"entry": _entry("delta")}))
+    assert [entry["id"] for entry in database.load()] == ["beta", "gamma", "delta"]
+
+    _apply(entries, database, CatalogMutation("add_manhwa", "alpha", {"entry": _entry("alpha", ["1", "2", "3"])}))
+    _apply(entries, database, CatalogMutation("delete_chapter", "alpha", {"number": "1"}))
+    _apply(entries, database, _add_chapter("alpha", "4"))
+    _apply(entries, database, CatalogMutation("delete_chapter", "alpha", {"number": "3"}))
+    _apply(entries, database, _add_chapter("alpha", "5"))
+
+    loaded = database.load()
+    assert [entry["id"] for entry in loaded] == ["beta", "gamma", "delta", "alpha"]
+    assert [ch["number"] for ch in loaded[-1]["chapters"]] == ["2", "4", "5"]
+    rows = database._connection().execute(
+        "SELECT number, position FROM chapters WHERE manhwa_id = 'alpha' ORDER BY position"
+    ).fetchall()
+    assert rows == [("2", 0), ("4", 1), ("5", 2)]
+    positions = [row[0] for row in database._connection().execute("SELECT position FROM manhwa ORDER BY position")]
+    assert positions == list(range(len(entries)))
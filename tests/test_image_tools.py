@@ -0,0 +1,151 @@
+import random
+import sys
+
+import pytest
+from PIL import Image, ImageDraw
+
+from server import image_tools
+from server.image_tools import convert_page, page_size, resolve_mode, tile_bounds, trim_box
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def scan(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setitem(sys.modules, "numpy", None)
+    return request.param
+
+
+def _page(margin="plain", size=(500, 700)):
+    width, height = size
+    if margin == "gradient":
+        img = Image.linear_gradient("L").resize(size).point(lambda value: 180 + value // 4)
+    elif margin == "noisy":
+        noise = Image.frombytes("L", size, random.Random(0).randbytes(width * height))
+        img = noise.point(lambda value: 225 + value // 32)
+    else:
+        img = Image.new("L", size, 235)
+    draw = ImageDraw.Draw(img)
+    for top in range(height // 7, height * 6 // 7, 20):
+        draw.rectangle((width * 3 // 20, top, width * 17 // 20, top + 10), fill=20)
+    if margin == "corner":
+        draw.rectangle((0, 0, 8, 8), fill=0)
+    return img.convert("RGB")
+
+
+def _save(img, path, **options):
+    img.save(path, "JPEG", quality=95, **options)
+    return path
+
+
+@pytest.mark.parametrize("margin", ["plain", "gradient", "noisy", "corner"])
+def test_trim_box_finds_content_inside_margins(scan, margin):
+    box = trim_box(_page(margin), 8)
+    assert box is not None
+    left, top, right, bottom = box
+    assert 55 <= left <= 70 and 80 <= top <= 95
+    assert 430 <= right <= 445 and 600 <= bottom <= 620
+
+
+def test_trim_box_keeps_full_width_strips_and_full_pages(scan):
+    strip = _page(size=(300, 1200))
+    left, top, right, bottom = trim_box(strip, 8)
+    assert (left, right) == (0, 300) and top > 0
+    full = Image.new("RGB", (400, 600), (235, 235, 235))
+    ImageDraw.Draw(full).rectangle((2, 2, 397, 597), outline=(0, 0, 0))
+    assert trim_box(full, 8) is None
+    assert trim_box(Image.new("RGB", (400, 600), (235, 235, 235)), 8) is None
+
+
+def test_lossless_jpeg_passes_through_untouched(tmp_path):
+    source = _save(_page(), tmp_path / "source.jpg")
+    result = convert_page(source, tmp_path / "out.jpg", "lossless", "", 0.0)
+    assert result.passthrough and not result.downscaled
+    assert (tmp_path / "out.jpg").read_bytes() == source.read_bytes()
+
+
+def test_watermark_forces_reencode(tmp_path):
+    source = _save(_page(), tmp_path / "source.jpg")
+    result = convert_page(source, tmp_path / "out.jpg", "lossless", "DMCA", 0.5)
+    assert not result.passthrough
+    assert (tmp_path / "out.jpg").read_bytes() != source.read_bytes()
+
+
+def test_trimmed_passthrough_page_is_cropped(tmp_path):
+    source = _save(_page(), tmp_path / "source.jpg")
+    result = convert_page(source, tmp_path / "out.jpg", "lossless", "", 0.0, trim_padding=8)
+    assert not result.passthrough
+    width, height = page_size(tmp_path / "out.jpg")
+    assert result.width == width < 500 and height < 700
+    assert result.trimmed_pixels == 500 * 700 - width * height
+
+
+def test_trimmed_pixels_are_reported_in_source_pixels(tmp_path):
+    source = _save(_page(size=(2000, 2800)), tmp_path / "source.jpg")
+    smart = convert_page(source, tmp_path / "smart.jpg", "smart", "", 0.0, trim_padding=32)
+    webtoon = convert_page(source, tmp_path / "webtoon.jpg", "webtoon", "", 0.0, trim_padding=32)
+    assert smart.trimmed_pixels > 0
+    assert abs(webtoon.trimmed_pixels - smart.trimmed_pixels) <= smart.trimmed_pixels * 0.02
+
+
+def test_webtoon_mode_resizes_to_reader_width(tmp_path):
+    source = _save(_page(size=(1800, 2400)), tmp_path / "source.jpg")
+    result = convert_page(source, tmp_path / "out.jpg", "webtoon", "", 0.0)
+    assert result.width == 900
+    assert page_size(tmp_path / "out.jpg") == (900, 1200)
+
+
+def test_tall_page_is_tiled_at_gutters(tmp_path):
+    strip = Image.new("RGB", (200, 2000), (255, 255, 255))
+    draw = ImageDraw.Draw(strip)
+    for top in range(0, 2000, 250):
+        draw.rectangle((20, top, 179, top + 200), fill=(40, 40, 40))
+    cuts = [bottom for _, bottom in tile_bounds(strip, 600)]
+    assert cuts[-1] == 2000
+    assert all(200 < cut % 250 for cut in cuts[:-1])
+    source = _save(strip, tmp_path / "strip.jpg")
+    result = convert_page(source, tmp_path / "strip-out.jpg", "smart", "", 0.0, tile_height=600)
+    heights = [page_size(tmp_path / name)[1] for name in result.tiles]
+    assert heights == [bottom - top for top, bottom in tile_bounds(strip, 600)]
+    assert len(heights) > 1 and all(height <= 900 for height in heights)
+
+
+def test_pixel_budget_downscales_only_reencoded_pages(tmp_path):
+    source = _save(_page(size=(1600, 2400)), tmp_path / "source.jpg")
+    budget = 1600 * 2400 // 3
+    smart = convert_page(source, tmp_path / "smart.jpg", "smart", "", 0.0, max_pixels=budget)
+    assert smart.downscaled
+    width, height = page_size(tmp_path / "smart.jpg")
+    assert width * height <= budget and smart.width == width
+    for mode in ("lossless", "original"):
+        result = convert_page(source, tmp_path / f"{mode}.jpg", mode, "", 0.0, max_pixels=budget)
+        assert not result.downscaled
+        assert page_size(tmp_path / f"{mode}.jpg") == (1600, 2400)
+
+
+def test_page_store_reuses_identical_conversions(tmp_path):
+    source = _save(_page(), tmp_path / "source.jpg")
+    store_dir = tmp_path / "store"
+    first = convert_page(source, tmp_path / "a.jpg", "smart", "", 0.0, store_dir=store_dir, trim_padding=8)
+    second = convert_page(source, tmp_path / "b.jpg", "smart", "", 0.0, store_dir=store_dir, trim_padding=8)
+    assert not first.reused and second.reused
+    assert (tmp_path / "a.jpg").read_bytes() == (tmp_path / "b.jpg").read_bytes()
+    third = convert_page(source, tmp_path / "c.jpg", "smart", "", 0.0, store_dir=store_dir)
+    assert not third.reused
+
+
+def test_target_mode_meets_ssim_threshold(tmp_path):
+    pytest.importorskip("numpy")
+    source = _save(_page(margin="noisy"), tmp_path / "source.jpg")
+    result = convert_page(source, tmp_path / "out.jpg", "target", "", 0.0, target_ssim=0.97)
+    with Image.open(source) as reference, Image.open(tmp_path / "out.jpg") as encoded:
+        score = image_tools._ssim(image_tools._luma_plane(reference), image_tools._luma_plane(encoded))
+    assert score >= 0.97
+    assert result.width == 500 and not result.passthrough
+
+
+def test_target_mode_falls_back_without_numpy(monkeypatch):
+    monkeypatch.setattr(image_tools, "numpy_available", lambda: False)
+    assert resolve_mode("target") == "smart"
+    assert resolve_mode("target_webp") == "webp"
@@ -0,0 +1,120 @@
+import gzip
+import json
+
+import pytest
+
+from server.catalog import CatalogMutation
+from server.changes import ChangeLog
+from server.publish import publish_catalog_files, read_version
+
+
+def _entry(manhwa_id, chapters):
+    return {
+        "id": manhwa_id,
+        "title": manhwa_id.title(),
+        "cover": f"/covers/{manhwa_id}.jpg",
+        "genres": [],
+        "status": "ongoing",
+        "updatedAt": "",
+        "chapters": [{"number": n, "pages": [f"{i:03d}.jpg" for i in range(40)]} for n in chapters],
+    }
+
+
+def _read(public_dir, url):
+    return json.loads((public_dir / url.lstrip("/")).read_bytes())
+
+
+def test_publish_writes_content_addressed_artifacts(tmp_path):
+    entries = [_entry("alpha", ["1", "2"]), _entry("beta", ["1"])]
+    pointer = publish_catalog_files(tmp_path, entries)
+
+    assert read_version(tmp_path) == pointer
+    assert _read(tmp_path, pointer["manhwa"]) == entries
+    library = _read(tmp_path, pointer["library"])["manhwa"]
+    assert [item["id"] for item in library] == ["alpha", "beta"]
+    assert library[0]["chapterCount"] == 2 and library[0]["latestChapter"] == "2"
+
+    detail = _read(tmp_path, library[0]["detail"])
+    assert [ref["pageCount"] for ref in detail["chapters"]] == [40, 40]
+    assert _read(tmp_path, detail["chapters"][0]["pagesUrl"])["pages"] == entries[0]["chapters"][0]["pages"]
+
+    snapshot = tmp_path / pointer["manhwa"].lstrip("/")
+    assert gzip.decompress(snapshot.with_name(snapshot.name + ".gz").read_bytes()) == snapshot.read_bytes()
+
+
+def _chapter_files(public_dir, pointer):
+    detail = _read(public_dir, _read(public_dir, pointer["library"])["manhwa"][0]["detail"])
+    return {ref["pagesUrl"].rsplit("/", 1)[1] for ref in detail["chapters"]}
+
+
+def test_republish_keeps_only_current_and_previous_files(tmp_path):
+    entries = [_entry("alpha", ["1", "2"]), _entry("beta", ["1"])]
+    first = publish_catalog_files(tmp_path, entries)
+    assert publish_catalog_files(tmp_path, entries) == first
+    first_files = _chapter_files(tmp_path, first)
+
+    entries[0]["chapters"][1]["pages"].append("extra.jpg")
+    second = publish_catalog_files(tmp_path, entries[:1], changed_ids={"alpha"})
+    assert second["manhwa"] != first["manhwa"]
+    assert (tmp_path / first["manhwa"].lstrip("/")).exists()
+    assert not (tmp_path / "catalog" / "beta").exists()
+
+    entries[0]["chapters"][0]["pages"].append("extra.jpg")
+    third = publish_catalog_files(tmp_path, entries[:1], changed_ids={"alpha"})
+    assert not (tmp_path / first["manhwa"].lstrip("/")).exists()
+    published = {path.name for path in (tmp_path / "catalog" / "alpha").glob("*.json")}
+    assert published == _chapter_files(tmp_path, second) | _chapter_files(tmp_path, third)
+    assert not first_files <= published
+
+
+def test_deployed_snapshots_are_retained(tmp_path):
+    entries = [_entry("alpha", ["1"])]
+    deployed = publish_catalog_files(tmp_path, entries)
+    entries[0]["chapters"].append({"number": "2", "pages": ["001.jpg"]})
+    publish_catalog_files(tmp_path, entries, deployed=deployed)
+    entries[0]["chapters"].append({"number": "3", "pages": ["001.jpg"]})
+    latest = publish_catalog_files(tmp_path, entries, deployed=deployed)
+
+    assert (tmp_path / deployed["manhwa"].lstrip("/")).exists()
+    assert (tmp_path / deployed["library"].lstrip("/")).exists()
+    assert len(list((tmp_path / "snapshots").glob("manhwa.*.json"))) == 3
+    assert latest["manhwa"] != deployed["manhwa"]
+
+
+def test_change_deltas_cover_revisions_since_last_publish(tmp_path):
+    change_log = ChangeLog(tmp_path / "catalog_changes.jsonl")
+    entries = [_entry("alpha", ["1"]), _entry("beta", ["1"])]
+    change_log.record([CatalogMutation("add_manhwa", "alpha"), CatalogMutation("add_manhwa", "beta")])
+    first = publish_catalog_files(tmp_path, entries, change_log=change_log)
+    assert first["revision"] == 2
+    assert not (tmp_path / "changes").exists()
+
+    entries[1]["chapters"].append({"number": "2", "pages": ["001.jpg"]})
+    change_log.record([CatalogMutation("add_chapter", "beta", {"number": "2"})])
+    second = publish_catalog_files(tmp_path, entries, change_log=change_log)
+
+    delta = json.loads((tmp_path / "changes" / "2.json").read_bytes())
+    assert (delta["from"], delta["to"], delta["reset"]) == (2, 3, False)
+    assert [(change["type"], change["chapter"]) for change in delta["changes"]] == [("chapter_added", "2")]
+    assert delta["manhwa"]["beta"]["chapterCount"] == 2
+    assert second["revision"] == 3
+
+
+def test_small_artifacts_drop_stale_compressed_siblings(tmp_path):
+    entries = [_entry(f"manhwa-{n}", ["1"]) for n in range(30)]
+    publish_catalog_files(tmp_path, entries)
+    library_path = tmp_path / "library.json"
+    assert library_path.with_name("library.json.gz").exists()
+
+    publish_catalog_files(tmp_path, [])
+    assert library_path.read_bytes() == b'{"manhwa":[]}'
+    assert not library_path.with_name("library.json.gz").exists()
+    assert not library_path.with_name("library.json.br").exists()
+    assert not list((tmp_path / "catalog").glob("*.json*"))
+
+
+def test_brotli_siblings_round_trip(tmp_path):
+    brotli = pytest.importorskip("brotli")
+    pointer = publish_catalog_files(tmp_path, [_entry(f"manhwa-{n}", ["1"]) for n in range(30)])
+    snapshot = tmp_path / pointer["library"].lstrip("/")
+    assert brotli.decompress(snapshot.with_name(snapshot.name + ".br").read_bytes()) == snapshot.read_bytes()
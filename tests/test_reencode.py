@@ -0,0 +1,116 @@
+import json
+import random
+
+import pytest
+from PIL import Image
+
+from server import processor, reencode
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    public_dir = tmp_path / "public"
+    manhwa_path = public_dir / "manhwa.json"
+    monkeypatch.setattr(reencode, "PUBLIC_DIR", public_dir)
+    monkeypatch.setattr(reencode, "MANHWA_PATH", manhwa_path)
+    monkeypatch.setattr(reencode, "SETTINGS_PATH", tmp_path / "data" / "settings.json")
+    monkeypatch.setattr(reencode, "REENCODE_STATE_PATH", tmp_path / "data" / "reencode_state.json")
+    monkeypatch.setattr(processor, "PAGE_WORKERS", 1)
+    chapter_dir = public_dir / "manhwa" / "solo" / "chapter-1"
+    chapter_dir.mkdir(parents=True)
+    pages = ["001.jpg", "002.jpg"]
+    for index, name in enumerate(pages):
+        noise = random.Random(index).randbytes(240 * 360 * 3)
+        Image.frombytes("RGB", (240, 360), noise).save(chapter_dir / name, quality=98)
+    chapter = {"id": "solo-chapter-1", "number": "1", "title": "Chapter 1", "pages": pages, "encoding": "jpeg"}
+    entry = {"id": "solo", "title": "Solo", "slug": "solo", "chapters": [chapter], "schema": 1}
+    manhwa_path.write_text(json.dumps([entry]))
+    return manhwa_path, chapter_dir
+
+
+def _chapter(manhwa_path):
+    return processor.get_chapter(manhwa_path, "solo", "1")
+
+
+def _files(chapter_dir):
+    return {path.name: path.read_bytes() for path in chapter_dir.iterdir()}
+
+
+def test_reencode_swaps_chapter_and_records_progress(library):
+    manhwa_path, chapter_dir = library
+    summary = reencode.run_reencode("webp")
+
+    assert summary["chapters"] == 1 and summary["bytes_after"] < summary["bytes_before"]
+    assert _chapter(manhwa_path)["pages"] == ["001.webp", "002.webp"]
+    assert sorted(_files(chapter_dir)) == ["001.webp", "002.webp"]
+    assert not chapter_dir.with_name("chapter-1.previous").exists()
+    state = json.loads(reencode.REENCODE_STATE_PATH.read_text())
+    assert state == {"mode": "webp", "done": ["solo/1"]}
+    assert reencode.run_reencode("webp")["chapters"] == 0
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def test_interrupted_swap_is_rolled_back(library, monkeypatch):
+    manhwa_path, chapter_dir = library
+    before = _files(chapter_dir)
+    flush = processor.flush_catalog
+
+    def crash(path):
+        flush(path)
+        raise Interrupted()
+
+    monkeypatch.setattr(processor, "flush_catalog", crash)
+    with pytest.raises(Interrupted):
+        reencode.run_reencode("webp")
+    assert _chapter(manhwa_path)["pages"] == ["001.webp", "002.webp"]
+    assert json.loads(reencode.REENCODE_STATE_PATH.read_text())["swap"]["committed"] is False
+
+    monkeypatch.setattr(processor, "flush_catalog", flush)
+    assert reencode._recover(json.loads(reencode.REENCODE_STATE_PATH.read_text()))
+    assert _files(chapter_dir) == before
+    chapter = _chapter(manhwa_path)
+    assert chapter["pages"] == ["001.jpg", "002.jpg"] and chapter["encoding"] == "jpeg"
+    assert "swap" not in json.loads(reencode.REENCODE_STATE_PATH.read_text())
+
+
+def test_rollback_restores_meta_when_page_names_are_unchanged(library):
+    manhwa_path, chapter_dir = library
+    saved = _chapter(manhwa_path)
+    backup_dir = chapter_dir.with_name("chapter-1.previous")
+    chapter_dir.rename(backup_dir)
+    chapter_dir.mkdir()
+    processor.add_chapter(
+        manhwa_path,
+        "solo",
+        "1",
+        saved["pages"],
+        overwrite=True,
+        auto_deploy_enabled=False,
+        meta={"encoding": "target", "pageWidths": {"001.jpg": 120}},
+    )
+    state = {
+        "mode": "target",
+        "done": [],
+        "swap": {"manhwa": "solo", "number": "1", "pages": saved["pages"], "meta": {"encoding": "jpeg"}},
+    }
+
+    assert reencode._recover(state)
+    chapter = _chapter(manhwa_path)
+    assert chapter["encoding"] == "jpeg" and "pageWidths" not in chapter
+    assert sorted(_files(chapter_dir)) == ["001.jpg", "002.jpg"]
+    assert not backup_dir.exists()
+
+
+def test_committed_swap_only_drops_backup(library):
+    manhwa_path, chapter_dir = library
+    backup_dir = chapter_dir.with_name("chapter-1.previous")
+    backup_dir.mkdir()
+    state = {"mode": "webp", "done": [], "swap": {"manhwa": "solo", "number": "1", "committed": True}}
+
+    assert reencode._recover(state)
+    assert not backup_dir.exists()
+    assert state == {"mode": "webp", "done": ["solo/1"]}
+    assert sorted(_files(chapter_dir)) == ["001.jpg", "002.jpg"]
@@ -7,6 +7,7 @@ const state = {
   currentChapter: null,
   pages: [],
   dirty: false,
+  revision: null,
 };
 
 const manhwaList = document.getElementById("manhwaList");
@@ -143,14 +144,43 @@ function selectChapter(chapter) {
 }
 
 async function loadManhwas() {
-  const response = await api("/api/manhwa");
-  state.manhwas = await response.json();
+  if (!(await applyChanges())) {
+    const changes = await api("/api/changes?head=1");
+    const response = await api("/api/manhwa");
+    state.manhwas = await response.json();
+    state.revision = changes.ok ? (await changes.json()).to : null;
+  }
   renderList();
   renderDetails();
   renderChapters();
   renderPages();
 }
 
+async function applyChanges() {
+  if (state.revision === null) return false;
+  const response = await api(`/api/changes?since=${state.revision}`);
+  if (!response.ok) return false;
+  const delta = await response.json();
+  if (delta.reset) return false;
+  Object.entries(delta.manhwa || {}).forEach(([id, item]) => {
+    const index = state.manhwas.findIndex((entry) => entry.id === id);
+    if (!item) {
+      if (index !== -1) state.manhwas.splice(index, 1);
+    } else if (index === -1) {
+      state.manhwas.push(item);
+    } else {
+      state.manhwas[index] = item;
+    }
+    if (state.currentManhwa?.id === id) {
+      state.currentManhwa = item;
+      state.currentChapter = item?.chapters.find((chapter) => chapter.number === state.currentChapter?.number) || null;
+      state.pages = state.currentChapter ? [...state.currentChapter.pages] : [];
+    }
+  });
+  state.revision = delta.to;
+  return true;
+}
+
 async function saveChanges() {
   if (!state.currentManhwa || !state.currentChapter) return;
   await api(`/api/manhwa/${state.currentManhwa.id}/chapters/${state.currentChapter.number}/pages`, {